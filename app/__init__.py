@@ -1,17 +1,22 @@
 import logging
-from flask import Flask, send_from_directory
+import threading
+from flask import Flask, jsonify, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from app.config import DevelopmentConfig
+from app.response_cache import response_cache
+from app.llm_cache import llm_cache
+from app.bill_cache import bill_cache
+from app.schema import prepare_schema
 import os
 
 db = SQLAlchemy()
 migrate = Migrate()
+logger = logging.getLogger(__name__)
 
 def create_app():
     logging.basicConfig(level=logging.DEBUG)
-    logger = logging.getLogger(__name__)
     
     app = Flask(__name__, static_folder='../build')
     
@@ -22,18 +27,48 @@ def create_app():
     app.config.from_object(DevelopmentConfig)
 
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'))
+    response_cache.init_app(app)
+    llm_cache.init_app(app)
+    bill_cache.init_app(app)
 
     with app.app_context():
         from . import models  
-        from .routes import term_routes, audit_routes, regenerate_routes, legislation_routes
+        from . import airtable_import, airtable_sync, keyword_sync, legislation, search  # register background job types
+        from .jobs import job_runner
+        from .routes import term_routes, audit_routes, regenerate_routes, legislation_routes, job_routes, search_routes
         app.register_blueprint(term_routes.bp, url_prefix='/api/terms')
         app.register_blueprint(audit_routes.bp, url_prefix='/api/audit')
         app.register_blueprint(regenerate_routes.bp, url_prefix='/api')
         app.register_blueprint(legislation_routes.bp, url_prefix='/api/legislation')
-        
-        logger.debug("Database tables creation if not existing.")
-        db.create_all()
+        app.register_blueprint(job_routes.bp, url_prefix='/api/jobs')
+        app.register_blueprint(search_routes.bp, url_prefix='/api/search')
+        job_runner.init_app(app)
+
+    # Not in create_app itself: `flask db ...` and other CLI commands load the app too,
+    # and must not touch the schema or start jobs before they run.
+    startup_lock = threading.Lock()
+    started = threading.Event()
+
+    @app.before_request
+    def start_on_first_request():
+        if not started.is_set():
+            with startup_lock:
+                if not started.is_set():
+                    start_services(app)
+                    started.set()
+
+    @app.route('/api/cache/stats')
+    def cache_stats():
+        return jsonify(response_cache.stats())
+
+    @app.route('/api/cache/llm/stats')
+    def llm_cache_stats():
+        return jsonify(llm_cache.stats())
+
+    @app.route('/api/cache/bills/stats')
+    def bill_cache_stats():
+        return jsonify(bill_cache.stats())
 
     @app.route('/')
     def serve_index():
@@ -48,6 +83,19 @@ def create_app():
 
     return app
 
+
+def start_services(app):
+    """Prepare the schema and start background work; returns whether the database is ready."""
+    from . import search
+    from .jobs import job_runner
+    with app.app_context():
+        logger.debug("Database tables creation if not existing.")
+        if not prepare_schema(db, migrate):
+            return False
+        job_runner.recover()
+        search.search_index.init_app(app)
+        return True
+
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=True)
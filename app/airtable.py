@@ -0,0 +1,220 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+AIRTABLE_API_URL = 'https://api.airtable.com/v0'
+AIRTABLE_BATCH_SIZE = 10
+AIRTABLE_RATE_LIMIT = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A 5xx may arrive after Airtable has applied the request; repeating these is harmless.
+IDEMPOTENT_METHODS = {'GET', 'PATCH', 'DELETE'}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back for at least seconds, e.g. after a 429."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+            self._updated = time.monotonic()
+
+
+def _never_sent(error):
+    """True for connection errors raised before any of the request reached the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def chunked(items, size=AIRTABLE_BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=1):
+    """Iterate over iterable from a background thread, staying up to depth items ahead.
+
+    Lets the next Airtable page download while the caller is still writing
+    the previous one; at most depth items are buffered. Exceptions raised by
+    the iterable are re-raised in the caller. Closing the generator early
+    stops the background thread at its next item.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except Exception as e:
+            put((_DONE, e))
+
+    thread = threading.Thread(target=produce, name='airtable-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+class AirtableClient:
+    """Airtable REST client for one table.
+
+    All calls share one pooled keep-alive session and one token bucket, so the
+    client stays under Airtable's 5 requests/second per base no matter how many
+    threads use it. 429 responses are retried, honoring Retry-After. 5xx
+    responses and connection errors are only retried for idempotent methods,
+    or when the connection failed before anything was sent, so a POST that
+    Airtable may already have applied is never repeated into duplicates.
+    """
+
+    def __init__(self, base_id, api_key, table_name, rate=AIRTABLE_RATE_LIMIT, pool_size=4, max_retries=5):
+        self.url = f"{AIRTABLE_API_URL}/{base_id}/{table_name}"
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, path='', **kwargs):
+        url = f"{self.url}/{path}" if path else self.url
+        backoff = 1
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if attempt == self.max_retries or not (idempotent or _never_sent(e)):
+                    raise
+                logging.warning(f"Airtable {method} failed to connect ({e}), retrying in {backoff}s")
+                self.limiter.pause(backoff)
+                backoff *= 2
+                continue
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if not retryable or attempt == self.max_retries:
+                break
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = backoff
+            else:
+                delay = 30 if response.status_code == 429 else backoff
+            logging.warning(f"Airtable {method} returned {response.status_code}, retrying in {delay}s")
+            self.limiter.pause(delay)
+            backoff *= 2
+        if not response.ok:
+            logging.error(f"Error response from Airtable: {response.status_code} {response.text}")
+            response.raise_for_status()
+        return response.json()
+
+    def create_records(self, fields_list):
+        """Create records 10 per request; returns the created records in order."""
+        created = []
+        for batch in chunked(fields_list):
+            data = self.request('POST', json={"records": [{"fields": fields} for fields in batch]})
+            created.extend(data.get('records', []))
+        return created
+
+    def update_records(self, updates):
+        """Patch (record_id, fields) pairs 10 per request; returns the updated records."""
+        updated = []
+        for batch in chunked(updates):
+            data = self.request('PATCH', json={"records": [{"id": record_id, "fields": fields} for record_id, fields in batch]})
+            updated.extend(data.get('records', []))
+        return updated
+
+    def delete_records(self, record_ids):
+        """Delete records 10 per request; returns the ids Airtable reports deleted."""
+        deleted = []
+        for batch in chunked(record_ids):
+            data = self.request('DELETE', params=[('records[]', record_id) for record_id in batch])
+            deleted.extend(record['id'] for record in data.get('records', []) if record.get('deleted'))
+        return deleted
+
+    def iter_pages(self, **params):
+        """Yield each page of records, following the offset cursor."""
+        while True:
+            data = self.request('GET', params=params)
+            yield data.get('records', [])
+            offset = data.get('offset')
+            if not offset:
+                break
+            params['offset'] = offset
+
+    def iter_records(self, **params):
+        for page in self.iter_pages(**params):
+            yield from page
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_airtable_client():
+    """Shared client for the table configured in the environment."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AirtableClient(
+                os.getenv('REACT_APP_AIRTABLE_BASE_ID'),
+                os.getenv('REACT_APP_AIRTABLE_API_KEY'),
+                os.getenv('REACT_APP_AIRTABLE_TABLE_NAME')
+            )
+        return _client
@@ -0,0 +1,212 @@
+import logging
+
+from app.airtable import get_airtable_client, prefetch
+from app.jobs import job_type
+from app.response_cache import response_cache
+from app.bulk import upsert_rows, delete_terms
+from app.keyword_sync import index_terms
+from app.models import Term, Audit, AirtableRecord, db
+from app.queries import AUDIT_FIELDS
+from app.search import search_index
+
+IMPORTED_TERM_FIELDS = [
+    'name', 'faqTitle',
+    'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+    'highKeywords', 'mediumKeywords', 'lowKeywords',
+    'faqHighKeywords', 'faqMediumKeywords', 'faqLowKeywords',
+    'prompt', 'response'
+]
+
+
+# Placeholder name for a term whose name moved to another id, until it is renamed or deleted.
+RELEASED_NAME_PREFIX = 'airtable-released:'
+
+
+def convert_to_boolean(value):
+    return value.lower() == 'true' if isinstance(value, str) else bool(value)
+
+
+def term_row(fields):
+    row = {"id": int(fields['id'])}
+    for field in IMPORTED_TERM_FIELDS:
+        row[field] = fields.get(field, '')
+    return row
+
+
+def same_value(current, new):
+    """Compare a stored value with an imported one; Airtable omits empty fields, stored as '' or None."""
+    return (current if current is not None else '') == (new if new is not None else '')
+
+
+def audit_row(fields):
+    return {
+        "id": int(fields['id']),
+        "FAQ": convert_to_boolean(fields.get('FAQ', False)),
+        "Summary": convert_to_boolean(fields.get('Summary', False)),
+        "Technical_Stuff": convert_to_boolean(fields.get('Technical_Stuff', False)),
+        "notes": fields.get('notes', '') or ''
+    }
+
+
+class AirtableImport:
+    """Apply Airtable records to the terms and audit tables in one transaction.
+
+    Each page of records is diffed in memory against the matching rows already
+    in the database; only new or changed rows are written, with set-based
+    upserts. finish() deletes terms that no Airtable record mentioned and
+    commits. Only the id list of the whole table is held across pages.
+
+    A name can move to another id in Airtable, e.g. when a record is deleted
+    and re-added. The row still holding the name is either stale, and goes in
+    finish(), or gets its own new name from a later record; until then it is
+    renamed out of the way so the upsert does not violate term.name UNIQUE.
+    """
+
+    def __init__(self):
+        self.existing_ids = {term_id for term_id, in db.session.query(Term.id)}
+        self.seen_ids = set()
+        self.counts = {
+            "terms_inserted": 0, "terms_updated": 0, "terms_unchanged": 0, "terms_deleted": 0,
+            "audits_inserted": 0, "audits_updated": 0, "audits_unchanged": 0,
+        }
+
+    def apply_page(self, records):
+        terms = {}
+        audits = {}
+        record_ids = {}
+        for record in records:
+            row = term_row(record['fields'])
+            terms[row['id']] = row
+            audits[row['id']] = audit_row(record['fields'])
+            record_ids[row['id']] = record['id']
+        if not terms:
+            return
+        self.release_names(terms)
+        self.seen_ids.update(terms)
+
+        columns = [getattr(Term, field) for field in IMPORTED_TERM_FIELDS]
+        current_terms = {
+            row[0]: dict(zip(IMPORTED_TERM_FIELDS, row[1:]))
+            for row in db.session.query(Term.id, *columns).filter(Term.id.in_(terms))
+        }
+        current_audits = {
+            row[0]: dict(zip(AUDIT_FIELDS, row[1:]))
+            for row in db.session.query(Audit.id, *[getattr(Audit, field) for field in AUDIT_FIELDS]).filter(Audit.id.in_(terms))
+        }
+
+        term_writes = []
+        for term_id, row in terms.items():
+            current = current_terms.get(term_id)
+            if current is None:
+                self.counts["terms_inserted"] += 1
+            elif not all(same_value(current[field], row[field]) for field in IMPORTED_TERM_FIELDS):
+                self.counts["terms_updated"] += 1
+            else:
+                self.counts["terms_unchanged"] += 1
+                continue
+            term_writes.append({**row, "keywordHash": None})
+
+        audit_writes = []
+        for term_id, row in audits.items():
+            current = current_audits.get(term_id)
+            if current is None:
+                self.counts["audits_inserted"] += 1
+            elif not all(same_value(current[field], row[field]) for field in AUDIT_FIELDS):
+                self.counts["audits_updated"] += 1
+            else:
+                self.counts["audits_unchanged"] += 1
+                continue
+            audit_writes.append(row)
+
+        changed = {row['id'] for row in term_writes}
+        search_index.remove(db.session.connection(), 'term', changed)
+        upsert_rows(Term, term_writes)
+        upsert_rows(Audit, audit_writes)
+        search_index.index(db.session.connection(), 'term', changed)
+        index_terms(changed)
+
+        mappings = dict(db.session.query(AirtableRecord.term_id, AirtableRecord.record_id).filter(AirtableRecord.term_id.in_(terms)))
+        upsert_rows(AirtableRecord, [
+            {"term_id": term_id, "record_id": record_id, "fields_hash": None}
+            for term_id, record_id in record_ids.items()
+            if term_id in changed or mappings.get(term_id) != record_id
+        ], index_elements=('term_id',))
+
+    def release_names(self, terms):
+        owners = {row['name']: term_id for term_id, row in terms.items() if row['name']}
+        holders = db.session.query(Term.id, Term.name).filter(Term.name.in_(owners)).all()
+        released = []
+        for term_id, name in holders:
+            if owners[name] == term_id:
+                continue
+            if term_id in self.seen_ids:
+                raise ValueError(f"Airtable records for terms {term_id} and {owners[name]} are both named {name!r}")
+            released.append(term_id)
+        if released:
+            logging.info(f"Renaming terms {released} whose names Airtable now gives to other ids")
+            search_index.remove(db.session.connection(), 'term', released)
+            Term.query.filter(Term.id.in_(released)).update(
+                {Term.name: RELEASED_NAME_PREFIX + db.cast(Term.id, db.String)}, synchronize_session=False
+            )
+            search_index.index(db.session.connection(), 'term', released)
+
+    def finish(self):
+        stale = self.existing_ids - self.seen_ids
+        self.counts["terms_deleted"] = delete_terms(stale)
+        db.session.commit()
+        logging.info(f"Airtable import finished: {self.counts}")
+        return self.counts
+
+
+def import_airtable_pages(pages):
+    """Import an iterable of record pages, one page at a time; returns the change counts.
+
+    Nothing is committed unless every page was applied.
+    """
+    try:
+        importer = AirtableImport()
+        for records in pages:
+            importer.apply_page(records)
+        return importer.finish()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def import_airtable_records(records):
+    """Import a complete list of Airtable records; returns the change counts."""
+    return import_airtable_pages([records])
+
+
+def pull_from_airtable(client=None, prefetch_pages=1, progress=None):
+    """Stream the whole Airtable table into the database.
+
+    Pages of 100 records are fetched by a background thread at most
+    prefetch_pages ahead of the page being written, so download and database
+    time overlap and only a couple of pages are held in memory.
+    progress(records) is called after each page is applied.
+    """
+    client = client or get_airtable_client()
+    pages = prefetch(client.iter_pages(pageSize=100), depth=prefetch_pages)
+    if progress is None:
+        return import_airtable_pages(pages)
+
+    def reporting(pages):
+        for records in pages:
+            yield records
+            progress(len(records))
+
+    return import_airtable_pages(reporting(pages))
+
+
+@job_type('pull_from_airtable')
+def pull_from_airtable_job(ctx):
+    """Import the Airtable table. The import is one transaction, so a resumed pull starts over."""
+    def progress(records):
+        ctx.progress(advance=records)
+        ctx.raise_if_cancelled()
+
+    counts = pull_from_airtable(progress=progress)
+    response_cache.invalidate('terms', 'term', 'audit')
+    return counts
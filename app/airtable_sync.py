@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.airtable import chunked, get_airtable_client
+from app.jobs import job_type
+from app.models import AirtableRecord, db
+from app.queries import terms_with_audit, unpack_term_row
+
+AIRTABLE_TERM_FIELDS = [
+    'name', 'faqTitle',
+    'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+    'highKeywords', 'mediumKeywords', 'lowKeywords',
+    'faqHighKeywords', 'faqMediumKeywords', 'faqLowKeywords',
+    'prompt', 'response'
+]
+
+
+def format_boolean(value):
+    return str(value)
+
+
+def sanitize_for_airtable(value):
+    if isinstance(value, str):
+        value = value.encode('unicode_escape').decode('utf-8')
+    return value
+
+
+def airtable_term_records():
+    """Build the Airtable fields of every term, keyed on term id."""
+    records = {}
+    for row in terms_with_audit(AIRTABLE_TERM_FIELDS).yield_per(200):
+        term, audit = unpack_term_row(row, AIRTABLE_TERM_FIELDS)
+        if audit is None:
+            audit_fields = {
+                "FAQ": "False",
+                "Summary": "False",
+                "Technical_Stuff": "False",
+                "notes": ''
+            }
+        else:
+            audit_fields = {
+                "FAQ": format_boolean(audit['FAQ']),
+                "Summary": format_boolean(audit['Summary']),
+                "Technical_Stuff": format_boolean(audit['Technical_Stuff']),
+                "notes": audit['notes'] or ''
+            }
+
+        fields = {**term, "id": str(term["id"]), **audit_fields}
+        records[term["id"]] = {k: sanitize_for_airtable(v) for k, v in fields.items()}
+    return records
+
+
+def fields_hash(fields):
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def reconcile_airtable_records(client):
+    """Rebuild the term id -> record id mapping from the records currently in Airtable.
+
+    Records whose id field is missing, unparseable or duplicated are returned
+    so the caller can delete them. Hashes are cleared, so every mapped record
+    is rewritten on the next push.
+    """
+    AirtableRecord.query.delete()
+    mapped = {}
+    extra = []
+    for record in client.iter_records():
+        try:
+            term_id = int(record.get('fields', {}).get('id'))
+        except (TypeError, ValueError):
+            extra.append(record['id'])
+            continue
+        if term_id in mapped:
+            extra.append(record['id'])
+            continue
+        mapped[term_id] = record['id']
+        db.session.add(AirtableRecord(term_id=term_id, record_id=record['id'], fields_hash=None))
+    db.session.flush()
+    logging.info(f"Reconciled {len(mapped)} Airtable records, {len(extra)} unmapped")
+    return extra
+
+
+def push_to_airtable(records_by_term_id, client=None, full=False, progress=None):
+    """Make the Airtable table match records_by_term_id ({term id: fields}).
+
+    Only terms whose fields hash differs from what was last pushed are sent.
+    New terms are created, changed ones patched and records of terms that no
+    longer exist deleted, 10 per request. The mapping is reconciled against
+    Airtable on the first push or when full is set. Mapping rows are updated
+    as each batch succeeds, so a failed push can simply be retried.
+    progress(done, total) is called after every batch.
+    """
+    client = client or get_airtable_client()
+    counts = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    extra = []
+    if full or not AirtableRecord.query.first():
+        try:
+            extra = reconcile_airtable_records(client)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    try:
+        mappings = {mapping.term_id: mapping for mapping in AirtableRecord.query.all()}
+        to_create = []
+        to_update = []
+        for term_id, fields in records_by_term_id.items():
+            digest = fields_hash(fields)
+            mapping = mappings.get(term_id)
+            if mapping is None:
+                to_create.append((term_id, fields, digest))
+            elif mapping.fields_hash != digest:
+                to_update.append((mapping, fields, digest))
+            else:
+                counts["unchanged"] += 1
+        stale = [mapping for term_id, mapping in mappings.items() if term_id not in records_by_term_id]
+
+        logging.info(f"Airtable push: {len(to_create)} to create, {len(to_update)} to update, "
+                     f"{len(stale) + len(extra)} to delete, {counts['unchanged']} unchanged")
+        total = len(to_create) + len(to_update) + len(stale) + len(extra)
+        done = 0
+
+        for batch in chunked(to_create):
+            created = client.create_records([fields for _, fields, _ in batch])
+            for (term_id, _, digest), record in zip(batch, created):
+                db.session.add(AirtableRecord(term_id=term_id, record_id=record['id'], fields_hash=digest))
+            counts["created"] += len(created)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+
+        for batch in chunked(to_update):
+            client.update_records([(mapping.record_id, fields) for mapping, fields, _ in batch])
+            for mapping, _, digest in batch:
+                mapping.fields_hash = digest
+            counts["updated"] += len(batch)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+
+        for batch in chunked(stale):
+            client.delete_records([mapping.record_id for mapping in batch])
+            for mapping in batch:
+                db.session.delete(mapping)
+            counts["deleted"] += len(batch)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+
+        if extra:
+            counts["deleted"] += len(client.delete_records(extra))
+            if progress:
+                progress(total, total)
+    finally:
+        db.session.commit()
+    return counts
+
+
+def delete_all_airtable_records(client=None, concurrency=4, progress=None):
+    """Empty the Airtable table and forget the local record mapping.
+
+    Record ids are listed first, a page of 100 at a time with only the id
+    field, then deleted 10 per request by up to concurrency threads sharing the
+    client's rate limit. The mapping rows of each deleted batch are removed and
+    committed as it completes, so after a failure the mapping still matches
+    what is left in Airtable and running it again finishes the job.
+    progress(deleted, total) is called after every batch.
+    """
+    client = client or get_airtable_client()
+    record_ids = [record['id'] for record in client.iter_records(**{'fields[]': 'id', 'pageSize': 100})]
+    total = len(record_ids)
+    logging.info(f"Deleting {total} Airtable records with {concurrency} workers")
+
+    deleted = 0
+    error = None
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(client.delete_records, batch): batch for batch in chunked(record_ids)}
+        try:
+            for future in as_completed(futures):
+                try:
+                    deleted += len(future.result())
+                except Exception as e:
+                    # Keep recording the batches that do go through.
+                    error = error or e
+                    continue
+                AirtableRecord.query.filter(AirtableRecord.record_id.in_(futures[future])).delete(synchronize_session=False)
+                db.session.commit()
+                if progress:
+                    progress(deleted, total)
+                logging.debug(f"Deleted {deleted}/{total} Airtable records")
+        finally:
+            for future in futures:
+                future.cancel()
+    if error is not None:
+        raise error
+
+    # Mappings of records that were no longer in Airtable.
+    AirtableRecord.query.delete()
+    db.session.commit()
+    logging.info(f"Deleted {deleted} Airtable records")
+    return {"deleted": deleted, "total": total}
+
+
+@job_type('clear_airtable')
+def clear_airtable_job(ctx):
+    """Delete every Airtable record; a resumed job lists and deletes whatever is left."""
+    def progress(deleted, total):
+        ctx.progress(done=deleted, total=total)
+        ctx.checkpoint({"deleted": deleted})
+
+    return delete_all_airtable_records(progress=progress)
+
+
+@job_type('push_to_airtable')
+def push_to_airtable_job(ctx, full=False):
+    """Push every term, committing the record mapping after each batch.
+
+    A resumed push skips reconciliation (it already ran) and only sends
+    what is still out of date.
+    """
+    def progress(done, total):
+        ctx.progress(done=done, total=total)
+        ctx.checkpoint({"pushed": done})
+
+    return push_to_airtable(airtable_term_records(), full=full and ctx.state is None, progress=progress)
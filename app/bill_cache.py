@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class BillCacheMiss(Exception):
+    pass
+
+
+class CachedDocument:
+    def __init__(self, url, content, content_type, encoding, from_cache):
+        self.url = url
+        self.content = content
+        self.content_type = content_type or ''
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class BillCache:
+    """Content-addressed, gzip-compressed store of raw bill documents fetched from congress.gov.
+
+    Each document is stored once under objects/ by the SHA-256 of its bytes, and
+    an SQLite index maps URLs to their current document and its ETag and
+    Last-Modified validators. Entries checked within BILL_CACHE_MAX_AGE
+    seconds are served without touching the network. Older entries are
+    revalidated with a conditional GET, and a 304 costs no download. In
+    offline mode (BILL_CACHE_OFFLINE) only cached documents are served and
+    anything else raises BillCacheMiss. Disabled when BILL_CACHE_PATH is empty.
+    """
+
+    def __init__(self, path=None, max_age=24 * 3600, offline=False):
+        self.root = None
+        self.max_age = max_age
+        self.offline = offline
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        if path:
+            self.open(path)
+
+    def init_app(self, app):
+        self.max_age = app.config.get('BILL_CACHE_MAX_AGE', self.max_age)
+        self.offline = app.config.get('BILL_CACHE_OFFLINE', self.offline)
+        path = app.config.get('BILL_CACHE_PATH')
+        if path:
+            self.open(os.path.join(app.instance_path, path))
+
+    def open(self, path):
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+        with self._lock:
+            self.root = path
+            self._conn = sqlite3.connect(os.path.join(path, 'index.db'), timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS bill_document ('
+                'url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, content_type TEXT, encoding TEXT, '
+                'etag TEXT, last_modified TEXT, size INTEGER NOT NULL, fetched_at REAL NOT NULL, checked_at REAL NOT NULL)'
+            )
+        logging.info(f"Bill document cache at {path}")
+
+    @property
+    def enabled(self):
+        return self._conn is not None
+
+    def _object_path(self, sha256):
+        return os.path.join(self.root, 'objects', sha256[:2], f'{sha256}.gz')
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT sha256, content_type, encoding, etag, last_modified, checked_at FROM bill_document WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._object_path(row[0])):
+            return None
+        return dict(zip(('sha256', 'content_type', 'encoding', 'etag', 'last_modified', 'checked_at'), row))
+
+    def _load(self, url, entry):
+        with gzip.open(self._object_path(entry['sha256']), 'rb') as f:
+            content = f.read()
+        return CachedDocument(url, content, entry['content_type'], entry['encoding'], True)
+
+    def _store(self, url, response):
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(partial, 'wb') as f:
+                f.write(content)
+            os.replace(partial, path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO bill_document '
+                '(url, sha256, content_type, encoding, etag, last_modified, size, fetched_at, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, sha256, response.headers.get('Content-Type'), response.encoding, response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), len(content), now, now)
+            )
+
+    def _touch(self, url):
+        with self._lock:
+            self._conn.execute('UPDATE bill_document SET checked_at = ? WHERE url = ?', (time.time(), url))
+
+    def fetch(self, session, url, timeout=60):
+        """Return a CachedDocument for url, downloading or revalidating it only when needed.
+
+        HTTP errors are raised by response.raise_for_status() as usual.
+        """
+        if not self.enabled:
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return CachedDocument(url, response.content, response.headers.get('Content-Type'), response.encoding, False)
+
+        entry = self._lookup(url)
+        if entry is not None and (self.offline or time.time() - entry['checked_at'] < self.max_age):
+            self.hits += 1
+            return self._load(url, entry)
+        if self.offline:
+            raise BillCacheMiss(f"{url} is not in the bill cache and offline mode is on")
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            self._touch(url)
+            self.revalidated += 1
+            return self._load(url, entry)
+        response.raise_for_status()
+        self._store(url, response)
+        self.downloads += 1
+        return CachedDocument(url, response.content, response.headers.get('Content-Type'), response.encoding, False)
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bill_document').fetchone()
+        stored = 0
+        for directory, _, files in os.walk(os.path.join(self.root, 'objects')):
+            stored += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return {
+            "enabled": True,
+            "offline": self.offline,
+            "max_age": self.max_age,
+            "entries": entries,
+            "bytes": size,
+            "stored_bytes": stored,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "downloads": self.downloads
+        }
+
+
+bill_cache = BillCache()
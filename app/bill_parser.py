@@ -0,0 +1,173 @@
+import html
+import io
+
+from lxml import etree
+
+# Elements that open a new numbered unit of a bill, outermost first.
+DIVISION_TAGS = ('division', 'title', 'subtitle', 'part', 'subpart', 'chapter', 'subchapter')
+PROVISION_TAGS = ('section', 'subsection', 'paragraph', 'subparagraph', 'clause', 'subclause', 'item', 'subitem')
+STRUCTURE_TAGS = frozenset(DIVISION_TAGS + PROVISION_TAGS)
+LINE_TAGS = frozenset(('enum', 'header', 'text', 'after-quoted-block'))
+TITLE_TAGS = frozenset(('official-title',))
+SKIPPED_TAGS = frozenset(('metadata', 'toc', 'endorsement', 'attestation'))
+QUOTED_TAGS = frozenset(('quoted-block',))
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _text(element):
+    text = ' '.join(''.join(element.itertext()).split())
+    # Bills use HTML entities such as &mdash; that are only declared in the DTD, which is never loaded.
+    return html.unescape(text) if '&' in text else text
+
+
+class BillSection:
+    def __init__(self, enum=None, header=None, division=None):
+        self.enum = enum
+        self.header = header
+        self.division = division
+        self.lines = []
+
+    @property
+    def text(self):
+        return '\n'.join(self.lines)
+
+    def to_dict(self):
+        return {"enum": self.enum, "header": self.header, "division": self.division, "text": self.text}
+
+
+class ParsedBill:
+    """Title and sections of a bill, in document order.
+
+    complete is False when parsing stopped at max_chars before the end of the
+    document.
+    """
+
+    def __init__(self):
+        self.title = None
+        self.sections = []
+        self.complete = True
+        self.chars = 0
+
+    @property
+    def text(self):
+        parts = [self.title] if self.title else []
+        for section in self.sections:
+            heading = ' '.join(filter(None, [section.enum, section.header]))
+            if heading and (not section.lines or not section.lines[0].startswith(heading)):
+                parts.append(heading)
+            parts.extend(section.lines)
+        return '\n'.join(parts)
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "complete": self.complete,
+            "sections": [section.to_dict() for section in self.sections]
+        }
+
+
+def parse_bill_xml(content, max_chars=None):
+    """Stream bill XML once and collect its title, sections and legislative text.
+
+    content is the raw document (bytes or a file object). Each enum, header
+    and text element becomes part of a line of the section it belongs to, so
+    "(a) In general.— The Secretary shall ..." stays together. Elements are
+    discarded as soon as they have been read, and parsing stops as soon as
+    max_chars characters of text have been collected, so the rest of a large
+    bill is never read.
+    """
+    source = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
+    bill = ParsedBill()
+    divisions = []
+    section = None
+    line = []
+    skipping = 0
+    quoted = 0
+
+    def new_section():
+        nonlocal section
+        section = BillSection(division=' / '.join(filter(None, divisions)) or None)
+        bill.sections.append(section)
+
+    def flush_line():
+        if not line:
+            return
+        if section is None:
+            new_section()
+        text = ' '.join(line)
+        section.lines.append(text)
+        bill.chars += len(text) + 1
+        line.clear()
+
+    events = etree.iterparse(
+        source, events=('start', 'end'), recover=True, resolve_entities=False, no_network=True, huge_tree=True
+    )
+    for event, element in events:
+        tag = _local(element.tag)
+        if event == 'start':
+            if tag in SKIPPED_TAGS:
+                skipping += 1
+            elif skipping:
+                pass
+            elif tag in QUOTED_TAGS:
+                quoted += 1
+            elif tag in STRUCTURE_TAGS:
+                flush_line()
+                if not quoted and tag in DIVISION_TAGS:
+                    divisions.append('')
+                    section = None
+                elif not quoted and tag == 'section':
+                    section = None
+            continue
+
+        if skipping:
+            if tag in SKIPPED_TAGS:
+                skipping -= 1
+                element.clear()
+            continue
+
+        parent = element.getparent()
+        parent_tag = _local(parent.tag) if parent is not None else ''
+        if tag in TITLE_TAGS and bill.title is None and not quoted:
+            bill.title = _text(element) or None
+            if bill.title:
+                bill.chars += len(bill.title) + 1
+        elif tag in LINE_TAGS:
+            value = _text(element)
+            if not value:
+                pass
+            elif tag == 'after-quoted-block' and section is not None and section.lines and not line:
+                section.lines[-1] += value
+            elif not quoted and parent_tag in DIVISION_TAGS and tag != 'text':
+                divisions[-1] = f'{divisions[-1]} {value}'.strip()
+            elif not quoted and parent_tag == 'section' and tag != 'text' and (section is None or not section.lines) and not line:
+                if section is None:
+                    new_section()
+                setattr(section, tag, value)
+            elif tag == 'header':
+                line.append(f'{value}.—')
+            else:
+                line.append(value)
+        elif tag in QUOTED_TAGS:
+            flush_line()
+            quoted -= 1
+        elif tag in STRUCTURE_TAGS:
+            flush_line()
+            if not quoted and tag in DIVISION_TAGS:
+                divisions.pop()
+                section = None
+
+        if tag in LINE_TAGS or tag in STRUCTURE_TAGS or tag in TITLE_TAGS or tag in QUOTED_TAGS:
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+        if max_chars is not None and bill.chars >= max_chars:
+            bill.complete = False
+            break
+
+    flush_line()
+    return bill
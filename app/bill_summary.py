@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+
+from app.llm import gather, mapped, then
+from app.llm_cache import cache_key
+from app.models import BillChunkSummary, db
+
+SUMMARY_MODEL = "gpt-4-turbo"
+
+
+def summary_prompt(text):
+    return (
+        f"Summarize the following legislative bill text: {text}. Provide an objective and informative description suitable for a public website. Avoid using any political bias and keep the description within 200 words."
+    )
+
+
+def chunk_prompt(text):
+    return (
+        f"Summarize the provisions in the following excerpt of a legislative bill: {text}. Be objective and specific, "
+        "do not speculate about parts of the bill that are not shown, and keep the summary within 150 words."
+    )
+
+
+def reduce_prompt(title, summaries):
+    parts = "\n\n".join(summaries)
+    about = f" \"{title}\"" if title else ""
+    return (
+        f"The following are summaries of consecutive parts of the legislative bill{about}:\n\n{parts}\n\n"
+        "Combine them into one summary of the whole bill. Provide an objective and informative description suitable for a public website. "
+        "Avoid using any political bias and keep the description within 200 words."
+    )
+
+
+def _section_blocks(parsed, chunk_chars):
+    """Text of each section with its heading; sections longer than chunk_chars are split between lines."""
+    for section in parsed.sections:
+        heading = ' '.join(filter(None, [section.enum, section.header]))
+        lines = ([heading] if heading else []) + section.lines
+        block, size = [], 0
+        for line in lines:
+            while len(line) > chunk_chars:
+                if block:
+                    yield '\n'.join(block)
+                    block, size = [], 0
+                yield line[:chunk_chars]
+                line = line[chunk_chars:]
+            if block and size + len(line) > chunk_chars:
+                yield '\n'.join(block)
+                block, size = [], 0
+            block.append(line)
+            size += len(line) + 1
+        if block:
+            yield '\n'.join(block)
+
+
+def chunk_bill(parsed, chunk_chars=6000):
+    """Split a ParsedBill on section boundaries into chunks of at most about chunk_chars characters.
+
+    Besides the size limit, a chunk also ends after any section whose content
+    hash has its low bits clear (once the chunk is a quarter full). Chunk
+    boundaries therefore depend on the sections themselves rather than only on
+    their position, and editing one section leaves the chunks further away
+    unchanged, so their cached summaries are reused.
+    """
+    chunks, current, size = [], [], 0
+    for block in _section_blocks(parsed, chunk_chars):
+        if current and size + len(block) > chunk_chars:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block) + 1
+        if size >= chunk_chars // 4 and hashlib.sha256(block.encode('utf-8')).digest()[0] % 4 == 0:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+def chunk_key(prompt):
+    return cache_key({"model": SUMMARY_MODEL, "prompt": prompt})
+
+
+def _copy_future(source, target):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _submit_limited(calls, limit):
+    """Run calls (each starting work and returning its future) with at most limit unfinished at once.
+
+    Returns one future per call, in order.
+    """
+    results = [Future() for _ in calls]
+    queue = list(enumerate(calls))
+    lock = threading.Lock()
+
+    def start_next():
+        with lock:
+            if not queue:
+                return
+            index, call = queue.pop(0)
+
+        def finished(future):
+            _copy_future(future, results[index])
+            start_next()
+
+        call().add_done_callback(finished)
+
+    for _ in range(min(limit, len(calls))):
+        start_next()
+    return results
+
+
+def submit_bill_summary(llm, parsed, text_limit, cache=True, chunked=True, chunk_chars=6000, chunk_concurrency=4):
+    """Start summarizing a ParsedBill; returns a future for (summary, new chunk summaries).
+
+    A bill whose text fits in text_limit characters (or any bill when chunked
+    is False) is summarized from its first text_limit characters in one call,
+    as before. Longer bills are split with chunk_bill(); up to
+    chunk_concurrency chunks are summarized at once and the partial summaries
+    are then combined into the final summary. Chunk summaries are looked up
+    in the bill_chunk_summary table first (unless cache is False). The ones
+    generated now are returned as {key: summary} so the caller can save them
+    with save_chunk_summaries() in the same transaction as the bill.
+    """
+    text = parsed.text
+    chunks = chunk_bill(parsed, chunk_chars) if chunked and (len(text) > text_limit or not parsed.complete) else []
+    if len(chunks) < 2:
+        prompt = summary_prompt(chunks[0] if chunks else text[:text_limit])
+        single = llm.submit(prompt, model=SUMMARY_MODEL, max_tokens=1500, temperature=0.7, cache=cache)
+        return mapped(single, lambda summary: (summary, {}))
+
+    prompts = [chunk_prompt(chunk) for chunk in chunks]
+    keys = [chunk_key(prompt) for prompt in prompts]
+    known = {}
+    if cache:
+        known = dict(db.session.query(BillChunkSummary.key, BillChunkSummary.summary).filter(BillChunkSummary.key.in_(set(keys))))
+    missing = {key: prompt for key, prompt in zip(keys, prompts) if key not in known}
+    logging.debug(f"Summarizing bill in {len(chunks)} chunks, {len(chunks) - len(missing)} cached")
+
+    calls = [
+        (lambda prompt=prompt: llm.submit(prompt, model=SUMMARY_MODEL, max_tokens=400, temperature=0.3, cache=cache))
+        for prompt in missing.values()
+    ]
+    fresh_futures = dict(zip(missing, _submit_limited(calls, chunk_concurrency)))
+
+    def combine(fresh_summaries):
+        fresh = dict(zip(fresh_futures, fresh_summaries))
+        summaries = [known[key] if key in known else fresh[key] for key in keys]
+        prompt = reduce_prompt(parsed.title, summaries)
+        return llm.chat(prompt, model=SUMMARY_MODEL, max_tokens=1500, temperature=0.7, cache=cache), fresh
+
+    return then(gather(list(fresh_futures.values())), llm.executor, combine)
+
+
+def save_chunk_summaries(fresh):
+    """Add newly generated chunk summaries to the session; the caller commits."""
+    for key, summary in fresh.items():
+        db.session.merge(BillChunkSummary(key=key, summary=summary))
@@ -0,0 +1,54 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Term, Audit, Keyword, KeywordEvent, KeywordOccurrence, AirtableRecord, db
+from app.search import search_index
+
+_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_rows(model, rows, index_elements=('id',)):
+    """INSERT ... ON CONFLICT DO UPDATE every row in one executemany.
+
+    rows are dicts with the same keys. Dialects without native upsert fall
+    back to session.merge() per row. The caller commits.
+    """
+    if not rows:
+        return
+    insert = _INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            db.session.merge(model(**row))
+        return
+    stmt = insert(model.__table__)
+    updates = {column: stmt.excluded[column] for column in rows[0] if column not in index_elements}
+    db.session.execute(stmt.on_conflict_do_update(index_elements=list(index_elements), set_=updates), rows)
+
+
+def delete_terms(term_ids):
+    """Delete terms and everything hanging off them with set-based statements.
+
+    Keyword removals are logged to keyword_event and the terms are dropped
+    from the search index just as the ORM delete hooks would. The caller
+    commits.
+    """
+    term_ids = list(term_ids)
+    if not term_ids:
+        return 0
+    keywords = db.session.query(Keyword.id, Keyword.keyword, Keyword.priority).filter(Keyword.term_id.in_(term_ids)).all()
+    keyword_ids = [keyword.id for keyword in keywords]
+    if keywords:
+        db.session.execute(KeywordEvent.__table__.insert(), [
+            {"keyword_id": keyword.id, "keyword": keyword.keyword, "priority": keyword.priority, "action": 'remove'}
+            for keyword in keywords
+        ])
+        KeywordOccurrence.query.filter(KeywordOccurrence.keyword_id.in_(keyword_ids)).delete(synchronize_session=False)
+        Keyword.query.filter(Keyword.id.in_(keyword_ids)).delete(synchronize_session=False)
+    KeywordOccurrence.query.filter(KeywordOccurrence.term_id.in_(term_ids)).delete(synchronize_session=False)
+    Audit.query.filter(Audit.id.in_(term_ids)).delete(synchronize_session=False)
+    AirtableRecord.query.filter(AirtableRecord.term_id.in_(term_ids)).delete(synchronize_session=False)
+    # Before the delete: the index forgets a document by its current text.
+    search_index.remove(db.session.connection(), 'term', term_ids)
+    return Term.query.filter(Term.id.in_(term_ids)).delete(synchronize_session=False)
@@ -0,0 +1,42 @@
+import zlib
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+COMPRESSED = b'z'
+PLAIN = b't'
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as a zlib-compressed blob, compressed and decompressed transparently.
+
+    Values shorter than min_size bytes are stored uncompressed (with a marker
+    byte) since zlib would not make them smaller. Values written before the
+    column was converted are still read as they are: plain strings on SQLite,
+    unmarked UTF-8 bytes elsewhere.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, min_size=256, level=6):
+        super().__init__()
+        self.min_size = min_size
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode('utf-8')
+        if len(data) < self.min_size:
+            return PLAIN + data
+        return COMPRESSED + zlib.compress(data, self.level)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        data = bytes(value)
+        if data[:1] == COMPRESSED:
+            return zlib.decompress(data[1:]).decode('utf-8')
+        if data[:1] == PLAIN:
+            return data[1:].decode('utf-8')
+        return data.decode('utf-8')
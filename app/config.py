@@ -7,6 +7,25 @@ class Config:
     CORS_HEADERS = 'Content-Type'
     STATIC_FOLDER = 'static'
     TEMPLATES_FOLDER = 'templates'
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_BUFFER_BYTES = int(os.getenv('RESPONSE_CACHE_BUFFER_BYTES', 1024 * 1024))
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH')
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 30 * 24 * 3600))
+    LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    BILL_CACHE_PATH = os.getenv('BILL_CACHE_PATH', 'bill_cache')
+    BILL_CACHE_MAX_AGE = int(os.getenv('BILL_CACHE_MAX_AGE', 24 * 3600))
+    BILL_CACHE_OFFLINE = os.getenv('BILL_CACHE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    BULK_TERM_CONCURRENCY = int(os.getenv('BULK_TERM_CONCURRENCY', 4))
+    BULK_TERM_BATCH_SIZE = int(os.getenv('BULK_TERM_BATCH_SIZE', 20))
+    LEGISLATION_FETCH_CONCURRENCY = int(os.getenv('LEGISLATION_FETCH_CONCURRENCY', 4))
+    LEGISLATION_PARSE_CONCURRENCY = int(os.getenv('LEGISLATION_PARSE_CONCURRENCY', 2))
+    LEGISLATION_SUMMARIZE_CONCURRENCY = int(os.getenv('LEGISLATION_SUMMARIZE_CONCURRENCY', 4))
+    LEGISLATION_BATCH_SIZE = int(os.getenv('LEGISLATION_BATCH_SIZE', 10))
+    LEGISLATION_CHUNKED_SUMMARY = os.getenv('LEGISLATION_CHUNKED_SUMMARY', '1').lower() in ('1', 'true', 'yes')
+    LEGISLATION_CHUNK_CHARS = int(os.getenv('LEGISLATION_CHUNK_CHARS', 6000))
+    LEGISLATION_MAX_CHUNKS = int(os.getenv('LEGISLATION_MAX_CHUNKS', 24))
+    LEGISLATION_CHUNK_CONCURRENCY = int(os.getenv('LEGISLATION_CHUNK_CONCURRENCY', 4))
 
 
 class DevelopmentConfig(Config):
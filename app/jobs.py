@@ -0,0 +1,315 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Job, db
+
+ACTIVE_STATUSES = ('queued', 'running')
+RESUMABLE_STATUSES = ('failed', 'cancelled', 'interrupted')
+
+JOB_TYPES = {}
+HEARTBEAT_INTERVAL = 30
+# A job whose process has not reported for this long is taken to be gone.
+HEARTBEAT_TIMEOUT = 4 * HEARTBEAT_INTERVAL
+
+
+def job_type(kind):
+    """Register fn(ctx, **params) as the handler for jobs of this kind."""
+    def decorator(fn):
+        JOB_TYPES[kind] = fn
+        return fn
+    return decorator
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobConflict(ValueError):
+    """A job of the requested kind is already active with different parameters."""
+
+    def __init__(self, job):
+        super().__init__(f"A {job.kind} job with different parameters is already {job.status}.")
+        self.job = job
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobContext:
+    """Handed to a running job: reports progress, saves checkpoints and carries the resume state.
+
+    progress() is cheap and only updates the live counters shown by the status
+    API. checkpoint(state) commits the job's own work together with its
+    progress and state, so a resumed job starts from ctx.state instead of the
+    beginning. Cancellation is noticed at checkpoints and raise_if_cancelled().
+    """
+
+    def __init__(self, runner, job):
+        self.runner = runner
+        self.job_id = job.id
+        self.params = json.loads(job.params) if job.params else {}
+        self.state = json.loads(job.checkpoint) if job.checkpoint else None
+        self.done = job.done or 0
+        self.total = job.total
+
+    def progress(self, done=None, total=None, advance=0):
+        if done is not None:
+            self.done = done
+        self.done += advance
+        if total is not None:
+            self.total = total
+        self.runner._set_live(self.job_id, self.done, self.total)
+
+    def raise_if_cancelled(self):
+        if self.runner._is_cancelled(self.job_id):
+            raise JobCancelled()
+
+    def checkpoint(self, state=None):
+        job = db.session.get(Job, self.job_id)
+        job.done = self.done
+        job.total = self.total
+        if state is not None:
+            self.state = state
+            job.checkpoint = json.dumps(state)
+        db.session.commit()
+        if job.cancel_requested:
+            self.runner._cancelled.add(self.job_id)
+        self.raise_if_cancelled()
+
+
+class JobRunner:
+    """Runs registered maintenance jobs on a small thread pool, outside the request.
+
+    Jobs are persisted in the job table, so their status, progress and last
+    checkpoint survive the request that started them and a server restart.
+    At most JOB_WORKERS jobs run at once and only one job of each kind may be
+    queued or running, which a partial unique index on the job table enforces
+    across processes, so maintenance work cannot crowd out interactive
+    requests. Each active job records the process running it, which
+    refreshes its heartbeat every HEARTBEAT_INTERVAL seconds. Jobs whose
+    process has exited, or has not reported within HEARTBEAT_TIMEOUT, are
+    marked 'interrupted' and can be resumed from their checkpoint; jobs of
+    other live processes (another worker, a CLI command) are left alone.
+    """
+
+    def __init__(self, max_workers=2):
+        self.app = None
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._live = {}
+        self._cancelled = set()
+        self._heartbeat = None
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get('JOB_WORKERS', self.max_workers)
+
+    @property
+    def owner(self):
+        # Read the pid each time: worker processes may be forked after the runner was created.
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _orphaned(self, job, host, stale_before):
+        if job.owner == self.owner:
+            return False
+        if not job.owner or job.heartbeat_at is None or job.heartbeat_at < stale_before:
+            return True
+        # On this host a stopped process is noticed at once instead of after HEARTBEAT_TIMEOUT.
+        job_host, _, pid = job.owner.rpartition(':')
+        return job_host == host and pid.isdigit() and not _process_alive(int(pid))
+
+    def recover(self):
+        """Mark queued or running jobs whose process has stopped as interrupted."""
+        host = socket.gethostname()
+        stale_before = _utcnow() - timedelta(seconds=HEARTBEAT_TIMEOUT)
+        active = Job.query.filter(Job.status.in_(ACTIVE_STATUSES)).all()
+        orphaned = [job for job in active if self._orphaned(job, host, stale_before)]
+        for job in orphaned:
+            job.status = 'interrupted'
+        db.session.commit()
+        if orphaned:
+            logging.warning(f"Marked {len(orphaned)} jobs of stopped processes as interrupted")
+
+    def _beat(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    Job.query.filter(Job.owner == self.owner, Job.status.in_(ACTIVE_STATUSES)).update(
+                        {Job.heartbeat_at: _utcnow()}, synchronize_session=False
+                    )
+                    db.session.commit()
+                    db.session.remove()
+            except Exception as e:
+                logging.error(f"Error updating job heartbeats: {e}")
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def _claim(self, job):
+        job.owner = self.owner
+        job.heartbeat_at = _utcnow()
+        with self._lock:
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._beat, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            return self._executor
+
+    def _set_live(self, job_id, done, total):
+        with self._lock:
+            self._live[job_id] = (done, total)
+
+    def _is_cancelled(self, job_id):
+        with self._lock:
+            return job_id in self._cancelled
+
+    def submit(self, kind, **params):
+        """Queue a job; returns (job, created).
+
+        An active job of the same kind and parameters is returned instead of a
+        new one; JobConflict is raised if it has different parameters.
+        """
+        if kind not in JOB_TYPES:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.recover()
+        while True:
+            active = Job.query.filter(Job.kind == kind, Job.status.in_(ACTIVE_STATUSES)).first()
+            if active is not None:
+                if (json.loads(active.params) if active.params else {}) != json.loads(json.dumps(params)):
+                    raise JobConflict(active)
+                return active, False
+            job = Job(id=uuid.uuid4().hex, kind=kind, status='queued', params=json.dumps(params), done=0, cancel_requested=False)
+            self._claim(job)
+            db.session.add(job)
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                # uq_job_active_kind: another request or process queued this kind first.
+                db.session.rollback()
+        self._get_executor().submit(self._run, job.id)
+        logging.info(f"Queued {kind} job {job.id}")
+        return job, True
+
+    def resume(self, job):
+        """Re-queue a failed, cancelled or interrupted job; it continues from its last checkpoint."""
+        if job.status not in RESUMABLE_STATUSES:
+            raise ValueError(f"Job {job.id} is {job.status} and cannot be resumed")
+        self.recover()
+        active = Job.query.filter(Job.kind == job.kind, Job.status.in_(ACTIVE_STATUSES)).first()
+        if active is not None:
+            raise ValueError(f"Job {active.id} of kind {job.kind} is already {active.status}")
+        job.status = 'queued'
+        job.cancel_requested = False
+        job.error = None
+        job.finished_at = None
+        self._claim(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise ValueError(f"A {job.kind} job is already queued or running")
+        with self._lock:
+            self._cancelled.discard(job.id)
+        self._get_executor().submit(self._run, job.id)
+        return job
+
+    def cancel(self, job):
+        """Cancel a queued job at once, or ask a running job to stop at its next checkpoint."""
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = db.func.now()
+        elif job.status == 'running':
+            job.cancel_requested = True
+            with self._lock:
+                self._cancelled.add(job.id)
+        else:
+            raise ValueError(f"Job {job.id} is already {job.status}")
+        db.session.commit()
+        return job
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            if job is None or job.status != 'queued':
+                return
+            job.status = 'running'
+            job.started_at = db.func.now()
+            db.session.commit()
+            ctx = JobContext(self, job)
+            status, result, error = 'succeeded', None, None
+            logging.info(f"Running {job.kind} job {job_id}")
+            try:
+                result = JOB_TYPES[job.kind](ctx, **ctx.params)
+            except JobCancelled:
+                db.session.rollback()
+                status = 'cancelled'
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Job {job_id} failed: {e}")
+                status, error = 'failed', str(e)
+            try:
+                job = db.session.get(Job, job_id)
+                job.status = status
+                job.done = ctx.done
+                job.total = ctx.total
+                job.result = json.dumps(result) if result is not None else None
+                job.error = error
+                job.finished_at = db.func.now()
+                db.session.commit()
+                logging.info(f"Job {job_id} {status}")
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Error recording result of job {job_id}: {e}")
+            finally:
+                with self._lock:
+                    self._live.pop(job_id, None)
+                    self._cancelled.discard(job_id)
+                db.session.remove()
+
+    def describe(self, job):
+        done, total = job.done, job.total
+        with self._lock:
+            if job.id in self._live:
+                done, total = self._live[job.id]
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "params": json.loads(job.params) if job.params else {},
+            "done": done,
+            "total": total,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "cancel_requested": job.cancel_requested,
+            "resumable": job.status in RESUMABLE_STATUSES,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+
+job_runner = JobRunner()
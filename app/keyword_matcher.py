@@ -0,0 +1,109 @@
+from collections import deque, namedtuple
+
+PRIORITIES = ('high', 'medium', 'low')
+
+Match = namedtuple('Match', ['keyword_id', 'keyword', 'priority', 'start', 'end'])
+
+
+def _fold(text):
+    """Lowercase text without changing its length, so match offsets line up with the original."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == '_'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over the keyword table.
+
+    Built once from a list of keywords, it scans a text in a single pass and
+    reports every whole-word, case-insensitive occurrence of every keyword.
+    """
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self.size = 0
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    @classmethod
+    def from_db(cls):
+        from app.models import Keyword
+        return cls(Keyword.query.all())
+
+    def _add(self, keyword):
+        pattern = _fold(keyword.keyword.strip())
+        if not pattern:
+            return
+        node = 0
+        for c in pattern:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((keyword.id, keyword.keyword, (keyword.priority or '').lower(), len(pattern)))
+        self.size += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                if node:
+                    self._fail[child] = self._goto[fail].get(c, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text):
+        """Yield a Match for every whole-word keyword occurrence in text."""
+        if not text or not self.size:
+            return
+        folded = _fold(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        length = len(folded)
+        node = 0
+        for i, c in enumerate(folded):
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < length and _is_word_char(folded[end]) and _is_word_char(c):
+                continue
+            for keyword_id, keyword, priority, size in out[node]:
+                start = end - size
+                if start > 0 and _is_word_char(folded[start - 1]) and _is_word_char(folded[start]):
+                    continue
+                yield Match(keyword_id, keyword, priority, start, end)
+
+    def match(self, *texts, exclude=None):
+        """Return {priority: [keyword, ...]} for the keywords found in any of texts.
+
+        Keywords are listed once each, in order of first occurrence. A keyword
+        equal to exclude (case-insensitive), usually the term's own name, is skipped.
+        """
+        excluded = exclude.lower() if exclude else None
+        grouped = {priority: [] for priority in PRIORITIES}
+        seen = set()
+        for text in texts:
+            for hit in self.find_all(text):
+                if hit.keyword_id in seen or hit.keyword.lower() == excluded:
+                    continue
+                seen.add(hit.keyword_id)
+                grouped.setdefault(hit.priority, []).append(hit.keyword)
+        return grouped
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+from collections import defaultdict
+
+from app.jobs import job_type
+from app.keyword_matcher import KeywordMatcher
+from app.response_cache import response_cache
+from app.models import Term, Keyword, KeywordEvent, KeywordOccurrence, db
+
+TERM_KEYWORD_COLUMNS = {
+    'high': 'highKeywords',
+    'medium': 'mediumKeywords',
+    'low': 'lowKeywords',
+}
+
+FAQ_KEYWORD_COLUMNS = {
+    'high': 'faqHighKeywords',
+    'medium': 'faqMediumKeywords',
+    'low': 'faqLowKeywords',
+}
+
+FINGERPRINT_FIELDS = [
+    'name', 'response', 'faqTitle',
+    'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+]
+
+INDEXED_FIELDS = [
+    'response', 'faqTitle',
+    'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+]
+
+_matcher_cache = {}
+
+
+def term_fingerprint(term):
+    """SHA-256 over every field that keyword matching reads."""
+    digest = hashlib.sha256()
+    for field in FINGERPRINT_FIELDS:
+        digest.update((getattr(term, field) or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def current_keyword_version():
+    return db.session.query(db.func.max(KeywordEvent.id)).scalar() or 0
+
+
+def current_matcher():
+    """Return a KeywordMatcher over the whole keyword table, rebuilt only when the keyword set changes."""
+    version = current_keyword_version()
+    cached = _matcher_cache.get('matcher')
+    if cached is None or cached[0] != version:
+        cached = (version, KeywordMatcher.from_db())
+        _matcher_cache['matcher'] = cached
+    return cached[1]
+
+
+def _occurrence_rows(term, matcher):
+    return [
+        {
+            "keyword_id": hit.keyword_id,
+            "term_id": term.id,
+            "field": field,
+            "start_offset": hit.start,
+            "end_offset": hit.end,
+            "priority": hit.priority,
+        }
+        for field in INDEXED_FIELDS
+        for hit in matcher.find_all(getattr(term, field))
+    ]
+
+
+def _insert_occurrences(rows):
+    if rows:
+        db.session.execute(KeywordOccurrence.__table__.insert(), rows)
+
+
+def index_term(term, matcher=None):
+    """Replace the occurrence index rows of one term. The caller commits."""
+    if matcher is None:
+        matcher = current_matcher()
+    KeywordOccurrence.query.filter_by(term_id=term.id).delete(synchronize_session=False)
+    rows = _occurrence_rows(term, matcher)
+    _insert_occurrences(rows)
+    return len(rows)
+
+
+def index_terms(term_ids, matcher=None):
+    """Reindex terms written with set-based statements, which skip the ORM paths calling index_term().
+
+    The caller commits.
+    """
+    term_ids = list(term_ids)
+    if not term_ids:
+        return 0
+    if matcher is None:
+        matcher = current_matcher()
+    # populate_existing: the session may hold these terms as they were before the statement.
+    terms = (Term.query.options(db.undefer(Term.response)).populate_existing()
+             .filter(Term.id.in_(term_ids)).all())
+    return sum(index_term(term, matcher) for term in terms)
+
+
+def term_texts(term):
+    """Return (summary texts, FAQ answer text) in the shape KeywordMatcher.match expects."""
+    faq_content = " ".join(filter(None, [
+        term.faqTitle, term.faqQ1, term.faqA1,
+        term.faqQ2, term.faqA2, term.faqQ3,
+        term.faqA3, term.faqQ4, term.faqA4,
+        term.faqQ5, term.faqA5
+    ]))
+    faq_answers = "\n".join(filter(None, [
+        term.faqA1, term.faqA2, term.faqA3,
+        term.faqA4, term.faqA5
+    ]))
+    return (term.response, faq_content), faq_answers
+
+
+def _split(value):
+    return [keyword for keyword in (value or '').split(', ') if keyword]
+
+
+def _write(term, columns, grouped):
+    for priority, column in columns.items():
+        setattr(term, column, ", ".join(grouped.get(priority, [])))
+
+
+def _apply_delta(term, columns, removed, found):
+    for priority, column in columns.items():
+        current = [keyword for keyword in _split(getattr(term, column)) if keyword.lower() not in removed]
+        present = {keyword.lower() for keyword in current}
+        current += [keyword for keyword in found.get(priority, []) if keyword.lower() not in present]
+        setattr(term, column, ", ".join(current))
+
+
+def _delta_for(version, cache):
+    """Build (removed names, touched keyword ids, matcher over added keywords) for events after version."""
+    if version not in cache:
+        events = KeywordEvent.query.filter(KeywordEvent.id > version).order_by(KeywordEvent.id).all()
+        removed = {event.keyword.lower() for event in events if event.action == 'remove'}
+        removed_ids = {event.keyword_id for event in events if event.action == 'remove'}
+        added_ids = {event.keyword_id for event in events if event.action == 'add'}
+        added = Keyword.query.filter(Keyword.id.in_(added_ids)).all() if added_ids else []
+        cache[version] = (removed, removed_ids | added_ids, KeywordMatcher(added))
+    return cache[version]
+
+
+def sync_term_keywords(terms=None):
+    """Bring keyword columns up to date, touching only terms that need it.
+
+    Terms whose text fingerprint changed (or that were never synced) are
+    rescanned against the full keyword set. Unchanged terms that were matched
+    against an older keyword set only have the keywords added or removed since
+    then applied. The keyword occurrence index is maintained alongside the
+    keyword columns. All changes are committed in one transaction.
+    """
+    if terms is None:
+        terms = Term.query.options(db.undefer(Term.response)).all()
+    version = current_keyword_version()
+    full_matcher = None
+    deltas = {}
+    counts = defaultdict(int)
+
+    for term in terms:
+        fingerprint = term_fingerprint(term)
+        if fingerprint == term.keywordHash and term.keywordVersion is not None and term.keywordVersion >= version:
+            counts['unchanged'] += 1
+            continue
+
+        summary_texts, faq_answers = term_texts(term)
+        if fingerprint != term.keywordHash or term.keywordVersion is None:
+            if full_matcher is None:
+                full_matcher = current_matcher()
+            _write(term, TERM_KEYWORD_COLUMNS, full_matcher.match(*summary_texts, exclude=term.name))
+            _write(term, FAQ_KEYWORD_COLUMNS, full_matcher.match(faq_answers, exclude=term.name))
+            index_term(term, full_matcher)
+            counts['rescanned'] += 1
+        else:
+            removed, stale_ids, delta_matcher = _delta_for(term.keywordVersion, deltas)
+            _apply_delta(term, TERM_KEYWORD_COLUMNS, removed, delta_matcher.match(*summary_texts, exclude=term.name))
+            _apply_delta(term, FAQ_KEYWORD_COLUMNS, removed, delta_matcher.match(faq_answers, exclude=term.name))
+            if stale_ids:
+                KeywordOccurrence.query.filter(
+                    KeywordOccurrence.term_id == term.id,
+                    KeywordOccurrence.keyword_id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+            _insert_occurrences(_occurrence_rows(term, delta_matcher))
+            counts['delta'] += 1
+
+        term.keywordHash = fingerprint
+        term.keywordVersion = version
+
+    db.session.commit()
+    logging.info(f"Keyword sync at version {version}: {dict(counts)}")
+    return {
+        "version": version,
+        "rescanned": counts['rescanned'],
+        "delta": counts['delta'],
+        "unchanged": counts['unchanged'],
+    }
+
+
+@job_type('sync_keywords')
+def sync_keywords_job(ctx, batch_size=100):
+    """Sync terms batch_size at a time in id order, committing and checkpointing after each batch."""
+    state = ctx.state or {"after": 0, "rescanned": 0, "delta": 0, "unchanged": 0}
+    term_ids = [term_id for term_id, in db.session.query(Term.id).filter(Term.id > state["after"]).order_by(Term.id)]
+    if ctx.state is None:
+        ctx.progress(done=0, total=len(term_ids))
+
+    result = {}
+    for i in range(0, len(term_ids), batch_size):
+        ctx.raise_if_cancelled()
+        batch = term_ids[i:i + batch_size]
+        result = sync_term_keywords(
+            Term.query.options(db.undefer(Term.response)).filter(Term.id.in_(batch)).order_by(Term.id).all()
+        )
+        for key in ('rescanned', 'delta', 'unchanged'):
+            state[key] += result[key]
+        state["after"] = batch[-1]
+        response_cache.invalidate('terms', 'term')
+        ctx.progress(advance=len(batch))
+        ctx.checkpoint(state)
+
+    return {
+        "version": result.get("version", current_keyword_version()),
+        "rescanned": state["rescanned"],
+        "delta": state["delta"],
+        "unchanged": state["unchanged"],
+    }
@@ -0,0 +1,306 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app.bill_cache import BillCacheMiss, bill_cache
+from app.bill_parser import BillSection, ParsedBill, parse_bill_xml
+from app.bill_summary import save_chunk_summaries, submit_bill_summary
+from app.jobs import job_type
+from app.llm import completed_in_window, get_llm_client, then
+from app.models import LegislativeBill, db
+from app.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+CONGRESS_POOL_SIZE = 16
+BILL_TEXT_LIMIT = 4000
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class LegislationError(Exception):
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def bill_url(congress_id, legislative_id):
+    return f"https://www.congress.gov/{congress_id}/bills/hr{legislative_id}/BILLS-{congress_id}hr{legislative_id}ih.xml"
+
+
+def get_congress_session():
+    """Shared keep-alive session for congress.gov, so range ingestion reuses its connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=CONGRESS_POOL_SIZE))
+        return _session
+
+
+def download_bill(url):
+    """Get a bill document through bill_cache; returns a CachedDocument."""
+    logger.debug(f"Fetching data from URL: {url}")
+    try:
+        return bill_cache.fetch(get_congress_session(), url)
+    except BillCacheMiss as e:
+        logger.error(str(e))
+        raise LegislationError(str(e), 404)
+    except requests.exceptions.HTTPError as http_err:
+        logger.error(f"HTTP error occurred: {http_err}")
+        raise LegislationError(f"Error fetching data from URL: {http_err}", http_err.response.status_code)
+    except Exception as e:
+        logger.error(f"Error fetching data from URL: {e}")
+        raise LegislationError("Error fetching data from URL", 500)
+
+
+def parse_bill(document, max_chars=BILL_TEXT_LIMIT):
+    """ParsedBill for a downloaded document, reading only as far as max_chars characters of text."""
+    try:
+        if 'application/xml' in document.content_type or 'text/xml' in document.content_type:
+            return parse_bill_xml(document.content, max_chars=max_chars)
+        bill = ParsedBill()
+        section = BillSection()
+        section.lines = document.text.splitlines()
+        bill.sections.append(section)
+        return bill
+    except Exception as e:
+        logger.error(f"Error parsing bill text: {e}")
+        raise LegislationError("Error parsing bill text", 500)
+
+
+def summary_settings():
+    """Chunked summarization settings from the app config."""
+    config = current_app.config
+    return {
+        "chunked": config['LEGISLATION_CHUNKED_SUMMARY'],
+        "chunk_chars": config['LEGISLATION_CHUNK_CHARS'],
+        "chunk_concurrency": config['LEGISLATION_CHUNK_CONCURRENCY'],
+    }
+
+
+def parse_limit(settings):
+    """How much of a bill to parse: everything the chunked summary may use, else the first BILL_TEXT_LIMIT characters."""
+    if settings["chunked"]:
+        return settings["chunk_chars"] * current_app.config['LEGISLATION_MAX_CHUNKS']
+    return BILL_TEXT_LIMIT
+
+
+def submit_bill_prompts(llm, parsed, settings, cache=True):
+    """Start the summary and title requests for a parsed bill; returns their futures.
+
+    The summary future's result is (summary, new chunk summaries), see submit_bill_summary().
+    """
+    text_excerpt = parsed.text[:3000]
+    prompt_title = (
+        f"Generate a concise and descriptive title for a legislative bill. The bill text excerpt is: \"{text_excerpt}\". "
+        "Provide a title that clearly and succinctly represents the main idea of the bill."
+    )
+
+    return [
+        submit_bill_summary(llm, parsed, BILL_TEXT_LIMIT, cache=cache, **settings),
+        llm.submit(prompt_title, model="gpt-4-turbo", max_tokens=150, temperature=0.7, cache=cache),
+    ]
+
+
+def generate_bill(congress_id, legislative_id, cache=True):
+    """Fetch a bill, generate its summary and title concurrently and save it; returns the new LegislativeBill."""
+    settings = summary_settings()
+    url = bill_url(congress_id, legislative_id)
+    parsed = parse_bill(download_bill(url), max_chars=parse_limit(settings))
+    text = parsed.text[:BILL_TEXT_LIMIT]
+    summary_future, title_future = submit_bill_prompts(get_llm_client(), parsed, settings, cache=cache)
+
+    try:
+        summary, chunk_summaries = summary_future.result()
+    except Exception as e:
+        logger.error(f"Error generating summary: {e}")
+        raise LegislationError(f"Error generating summary: {str(e)}", 500)
+
+    try:
+        bill_name = title_future.result()
+    except Exception as e:
+        logger.error(f"Error generating bill name: {e}")
+        raise LegislationError(f"Error generating bill name: {str(e)}", 500)
+
+    new_bill = LegislativeBill(
+        legislative_id=legislative_id,
+        summary=summary,
+        bill_name=bill_name,
+        congress_id=congress_id,
+        text=text,
+        link=url,
+        charcount=len(text)
+    )
+
+    try:
+        db.session.add(new_bill)
+        save_chunk_summaries(chunk_summaries)
+        db.session.commit()
+        logger.debug(f"New legislative bill added to database with id: {new_bill.id}")
+    except Exception as e:
+        logger.error(f"Database error while adding new legislative bill: {e}")
+        db.session.rollback()
+        raise LegislationError(f"Internal server error while creating new legislative bill: {str(e)}", 500)
+    return new_bill
+
+
+def ingest_bill_range(congress_id, legislative_ids, fetch_concurrency=4, parse_concurrency=2,
+                      summarize_concurrency=4, batch_size=10, cache=True):
+    """Fetch, parse and summarize bills as a pipeline and save them in batches.
+
+    Each stage has its own limit: up to fetch_concurrency downloads,
+    parse_concurrency parses and summarize_concurrency bills waiting on the
+    model run at once, and a bill moves to the next stage as soon as it
+    leaves the previous one. Bills that already exist are skipped.
+
+    Yields one result per id ('created', 'skipped' or 'failed'). Results are
+    only yielded right after a batch of batch_size bills has been committed,
+    so the session is clean whenever the consumer runs. If the consumer stops
+    early, bills already being summarized are still saved, but no new
+    downloads are started.
+    """
+    llm = get_llm_client()
+    settings = summary_settings()
+    max_chars = parse_limit(settings)
+    existing = {legislative_id for legislative_id, in db.session.query(LegislativeBill.legislative_id).filter_by(congress_id=congress_id)}
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_concurrency, thread_name_prefix='bill-fetch')
+    parse_pool = ThreadPoolExecutor(max_workers=parse_concurrency, thread_name_prefix='bill-parse')
+    batch = []
+    reported = []
+
+    def result(entry, status, **extra):
+        return {"legislative_id": entry["legislative_id"], "status": status, **extra}
+
+    def download(legislative_id):
+        entry = {"legislative_id": legislative_id, "url": bill_url(congress_id, legislative_id)}
+        if legislative_id in existing:
+            entry["status"] = 'skipped'
+            return entry, None
+        fetched = fetch_pool.submit(download_bill, entry["url"])
+        return entry, [fetched, then(fetched, parse_pool, lambda document: parse_bill(document, max_chars=max_chars))]
+
+    def downloaded():
+        # Closing this generator cancels downloads that have not started yet.
+        window = completed_in_window(
+            (download(legislative_id) for legislative_id in legislative_ids),
+            lambda started: started[1], fetch_concurrency + parse_concurrency,
+            on_close=lambda started, futures: futures[0].cancel()
+        )
+        try:
+            for (entry, futures), _ in window:
+                if futures is not None:
+                    try:
+                        entry["parsed"] = futures[1].result()
+                        entry["text"] = entry["parsed"].text[:BILL_TEXT_LIMIT]
+                    except Exception as e:
+                        entry.update(status='failed', message=getattr(e, 'message', str(e)))
+                yield entry
+        finally:
+            window.close()
+
+    def submit(entry):
+        if entry.get("status"):
+            return None
+        return submit_bill_prompts(llm, entry["parsed"], settings, cache=cache)
+
+    def flush():
+        nonlocal batch, reported
+        results = reported
+        if batch:
+            try:
+                db.session.commit()
+                results += [result(entry, 'created', id=bill.id) for entry, bill in batch]
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error committing legislative bill batch: {e}")
+                results += [result(entry, 'failed', message=f"Internal server error while creating new legislative bill: {str(e)}") for entry, _ in batch]
+            response_cache.invalidate('bills')
+        batch, reported = [], []
+        return results
+
+    def complete(entry, futures):
+        if futures is None:
+            reported.append(result(entry, entry["status"], message=entry.get("message")))
+        else:
+            try:
+                (summary, chunk_summaries), bill_name = [future.result() for future in futures]
+                bill = LegislativeBill(
+                    legislative_id=entry["legislative_id"],
+                    summary=summary,
+                    bill_name=bill_name,
+                    congress_id=congress_id,
+                    text=entry["text"],
+                    link=entry["url"],
+                    charcount=len(entry["text"])
+                )
+                db.session.add(bill)
+                save_chunk_summaries(chunk_summaries)
+                batch.append((entry, bill))
+            except Exception as e:
+                logger.error(f"Error generating legislative bill {entry['legislative_id']}: {e}")
+                reported.append(result(entry, 'failed', message=str(e)))
+        return flush() if len(batch) + len(reported) >= batch_size else []
+
+    parsed = downloaded()
+    window = completed_in_window(parsed, submit, summarize_concurrency, on_close=complete)
+    try:
+        for entry, futures in window:
+            yield from complete(entry, futures)
+        yield from flush()
+    finally:
+        window.close()
+        parsed.close()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+        if batch:
+            logger.warning(f"Legislation ingestion stopped early; saving {len(batch)} generated bills")
+            flush()
+
+
+@job_type('generate_legislation')
+def generate_legislation_job(ctx, congress_id, start, end, fetch_concurrency=None, parse_concurrency=None,
+                             summarize_concurrency=None):
+    """Generate bills start..end of one congress through ingest_bill_range().
+
+    Progress is checkpointed after every committed batch; a resumed job skips
+    the bills it already handled and retries the ones that failed. Stage
+    limits default to the LEGISLATION_* settings.
+    """
+    config = current_app.config
+    state = ctx.state or {"created": [], "skipped": [], "failed": {}}
+    handled = set(state["created"]) | set(state["skipped"])
+    ctx.progress(done=len(handled), total=end - start + 1)
+
+    batch_size = config['LEGISLATION_BATCH_SIZE']
+    results = ingest_bill_range(
+        congress_id,
+        [legislative_id for legislative_id in range(start, end + 1) if legislative_id not in handled],
+        fetch_concurrency=fetch_concurrency or config['LEGISLATION_FETCH_CONCURRENCY'],
+        parse_concurrency=parse_concurrency or config['LEGISLATION_PARSE_CONCURRENCY'],
+        summarize_concurrency=summarize_concurrency or config['LEGISLATION_SUMMARIZE_CONCURRENCY'],
+        batch_size=batch_size
+    )
+    try:
+        for count, row in enumerate(results, 1):
+            key = str(row["legislative_id"])
+            state["failed"].pop(key, None)
+            if row["status"] == 'failed':
+                state["failed"][key] = row["message"]
+            else:
+                state[row["status"]].append(row["legislative_id"])
+            ctx.progress(advance=1)
+            if count % batch_size == 0:
+                ctx.checkpoint(state)
+            ctx.raise_if_cancelled()
+    finally:
+        results.close()
+    ctx.checkpoint(state)
+
+    return {"created": len(state["created"]), "skipped": len(state["skipped"]), "failed": state["failed"]}
@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.llm_cache import cache_key, llm_cache
+
+OPENAI_CHAT_URL = 'https://api.openai.com/v1/chat/completions'
+SYSTEM_PROMPT = "You are a helpful assistant."
+
+
+class LLMError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMClient:
+    """OpenAI chat completions client shared by every route.
+
+    Requests go over one pooled keep-alive session, so only the first call
+    pays for the TLS handshake, and each call has its own timeout.
+    chat_many() sends independent prompts concurrently on a bounded thread
+    pool; it takes about as long as the slowest prompt. Replies are looked up
+    in and stored to llm_cache when it is enabled; cache=False skips the lookup
+    but still stores the fresh reply.
+    """
+
+    def __init__(self, api_key, pool_size=8, max_workers=4, timeout=120):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {api_key}'
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+
+    def chat(self, prompt, model='gpt-4o', max_tokens=650, temperature=None, timeout=None, cache=True):
+        """Send one user prompt and return the stripped reply text."""
+        payload = {
+            'model': model,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': max_tokens
+        }
+        if temperature is not None:
+            payload['temperature'] = temperature
+        key = cache_key(payload)
+        if cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            response = self.session.post(OPENAI_CHAT_URL, json=payload, timeout=timeout or self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise LLMError(f"OpenAI request failed: {e}") from e
+        if response.status_code != 200:
+            logging.error(f'OpenAI request failed: {response.status_code} {response.text}')
+            raise LLMError(f'Request failed with status code: {response.status_code}', response.status_code)
+        reply = response.json()['choices'][0]['message']['content'].strip()
+        llm_cache.put(key, model, reply)
+        return reply
+
+    def submit(self, prompt, **kwargs):
+        """Start chat(prompt) on the pool and return its future."""
+        return self.executor.submit(self.chat, prompt, **kwargs)
+
+    def chat_many(self, prompts, **kwargs):
+        """Send prompts concurrently; returns a reply or LLMError per prompt, in order."""
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except LLMError as e:
+                results.append(e)
+        return results
+
+
+def completed_in_window(items, submit, limit, on_close=None):
+    """Yield (item, futures) for each item once all of its futures are done.
+
+    submit(item) starts the item's requests and returns their futures, or None
+    for an item that needs no requests (it is yielded straight away). At most
+    limit items are in flight and they are yielded in completion order. If the
+    generator is closed early, on_close(item, futures) is called for every
+    item still in flight.
+    """
+    in_flight = {}
+
+    def ready():
+        pending = [future for _, futures in in_flight.values() for future in futures if not future.done()]
+        if pending:
+            wait(pending, return_when=FIRST_COMPLETED)
+        done = [key for key, (_, futures) in in_flight.items() if all(future.done() for future in futures)]
+        for key in done:
+            yield in_flight.pop(key)
+
+    try:
+        for key, item in enumerate(items):
+            futures = submit(item)
+            if futures is None:
+                yield item, None
+                continue
+            in_flight[key] = (item, futures)
+            while len(in_flight) >= limit:
+                yield from ready()
+        while in_flight:
+            yield from ready()
+    finally:
+        if in_flight and on_close:
+            for item, futures in list(in_flight.values()):
+                on_close(item, futures)
+            in_flight.clear()
+
+
+def then(future, executor, fn):
+    """Future for fn(future.result()), run on executor once future has finished."""
+    chained = Future()
+
+    def relay(inner):
+        if inner.cancelled():
+            chained.cancel()
+        elif inner.exception() is not None:
+            chained.set_exception(inner.exception())
+        else:
+            chained.set_result(inner.result())
+
+    def start(done):
+        if done.cancelled():
+            chained.cancel()
+        elif done.exception() is not None:
+            chained.set_exception(done.exception())
+        else:
+            try:
+                executor.submit(fn, done.result()).add_done_callback(relay)
+            except RuntimeError as e:
+                chained.set_exception(e)
+
+    future.add_done_callback(start)
+    return chained
+
+
+def mapped(future, fn):
+    """Future for fn(future.result()), computed in future's done-callback.
+
+    For cheap fn only: unlike then(), nothing is queued on an executor, so
+    the result is not held up behind work waiting for the same pool.
+    """
+    chained = Future()
+
+    def relay(done):
+        if done.cancelled():
+            chained.cancel()
+        elif done.exception() is not None:
+            chained.set_exception(done.exception())
+        else:
+            try:
+                chained.set_result(fn(done.result()))
+            except Exception as e:
+                chained.set_exception(e)
+
+    future.add_done_callback(relay)
+    return chained
+
+
+def gather(futures):
+    """Future for the list of results of futures, failing with the first exception among them."""
+    gathered = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        for future in futures:
+            if future.cancelled():
+                gathered.cancel()
+                return
+            if future.exception() is not None:
+                gathered.set_exception(future.exception())
+                return
+        gathered.set_result([future.result() for future in futures])
+
+    if not futures:
+        gathered.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+    return gathered
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Shared client for the OpenAI key configured in the environment."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            max_workers = int(os.getenv('LLM_MAX_WORKERS', 8))
+            _client = LLMClient(os.getenv('REACT_APP_API_KEY'), pool_size=max_workers, max_workers=max_workers)
+        return _client
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from flask import has_request_context, request
+
+
+# Expired entries are swept at most this often, or when the size limit is reached.
+EXPIRE_INTERVAL = 300
+
+
+def cache_key(payload):
+    """SHA-256 over the model, messages and sampling parameters of a chat payload."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """Disk-backed cache of model replies, stored in its own SQLite file.
+
+    Disabled until init_app() is given LLM_CACHE_PATH. Entries expire after
+    LLM_CACHE_TTL seconds and the least recently used ones are evicted once
+    the stored replies exceed LLM_CACHE_MAX_BYTES. The file is shared by all
+    worker processes, so each keeps only an estimate of the stored size and
+    sums the table when the estimate crosses the limit. A cache that cannot be
+    read or written (locked, disk full) counts as a miss and the caller goes on
+    to the live request.
+    """
+
+    def __init__(self, path=None, ttl=30 * 24 * 3600, max_bytes=256 * 1024 * 1024):
+        self.path = None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._size = 0
+        self._expired_at = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        if path:
+            self.open(path)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('LLM_CACHE_TTL', self.ttl)
+        self.max_bytes = app.config.get('LLM_CACHE_MAX_BYTES', self.max_bytes)
+        path = app.config.get('LLM_CACHE_PATH')
+        if path:
+            self.open(os.path.join(app.instance_path, path))
+
+    def open(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.path = path
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_response ('
+                'key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, size INTEGER NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_response_accessed_at ON llm_response (accessed_at)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_response_created_at ON llm_response (created_at)')
+            self._size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_response').fetchone()[0]
+        logging.info(f"LLM response cache at {path}")
+
+    @property
+    def enabled(self):
+        return self._conn is not None
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute('SELECT response, created_at FROM llm_response WHERE key = ?', (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    self._conn.execute('DELETE FROM llm_response WHERE key = ?', (key,))
+                    row = None
+                if row is not None:
+                    self._conn.execute('UPDATE llm_response SET accessed_at = ? WHERE key = ?', (now, key))
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache read failed, calling the model: {e}")
+                self.errors += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response):
+        if not self.enabled:
+            return
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO llm_response (key, model, response, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', (key, model, response, size, now, now)
+                )
+                # Replaced rows and other processes' writes are not tracked; the estimate
+                # only decides when to sum the table, which resets it.
+                self._size += size
+                if self._size > self.max_bytes or now - self._expired_at > EXPIRE_INTERVAL:
+                    self._evict(now)
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache write failed: {e}")
+                self.errors += 1
+
+    def _evict(self, now):
+        self._conn.execute('DELETE FROM llm_response WHERE created_at < ?', (now - self.ttl,))
+        self._expired_at = now
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_response').fetchone()[0]
+        self._size = total
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute('SELECT key, size FROM llm_response ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM llm_response WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        self._size = total
+        logging.debug(f"Evicted {evicted} LLM cache entries")
+
+    def clear(self):
+        if self.enabled:
+            with self._lock:
+                self._conn.execute('DELETE FROM llm_response')
+                self._size = 0
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else None
+        }
+
+
+def llm_cache_requested():
+    """False when the current request asked to skip the LLM cache (?cache=0 or Cache-Control: no-cache)."""
+    if not has_request_context():
+        return True
+    if request.args.get('cache', '').lower() in ('0', 'false', 'no'):
+        return False
+    return 'no-cache' not in request.headers.get('Cache-Control', '')
+
+
+llm_cache = LLMCache()
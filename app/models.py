@@ -1,4 +1,6 @@
+from sqlalchemy import event
 from . import db
+from .column_types import CompressedText
 
 class Term(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,11 +22,15 @@ class Term(db.Model):
     faqHighKeywords = db.Column(db.Text, nullable=True)
     faqMediumKeywords = db.Column(db.Text, nullable=True)
     faqLowKeywords = db.Column(db.Text, nullable=True)
-    prompt = db.Column(db.Text, nullable=True)
-    response = db.Column(db.Text, nullable=True)
+    # Large texts are compressed and only loaded when read; both load together.
+    prompt = db.deferred(db.Column(CompressedText, nullable=True), group='text')
+    response = db.deferred(db.Column(CompressedText, nullable=True), group='text')
     keywords = db.relationship('Keyword', backref='term', cascade='all, delete-orphan')
+    occurrences = db.relationship('KeywordOccurrence', backref='term', cascade='all, delete-orphan')
     audit = db.relationship('Audit', uselist=False, backref='term', cascade='all, delete-orphan')
     notes = db.Column(db.Text, nullable=True)
+    keywordHash = db.Column(db.String(64), nullable=True)
+    keywordVersion = db.Column(db.Integer, nullable=True)
 
     def __repr__(self):
         return f'<Term {self.name}>'
@@ -45,19 +51,116 @@ class Keyword(db.Model):
     keyword = db.Column(db.String(255), nullable=False, unique=True)
     priority = db.Column(db.String(50), nullable=False)
     term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False) 
+    occurrences = db.relationship('KeywordOccurrence', backref='keyword', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Keyword {self.keyword}>'
 
+class KeywordOccurrence(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), nullable=False, index=True)
+    term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False, index=True)
+    field = db.Column(db.String(50), nullable=False)
+    start_offset = db.Column(db.Integer, nullable=False)
+    end_offset = db.Column(db.Integer, nullable=False)
+    priority = db.Column(db.String(50), nullable=False)
+
+    def __repr__(self):
+        return f'<KeywordOccurrence {self.keyword_id} in {self.term_id}.{self.field}>'
+
+class KeywordEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    keyword_id = db.Column(db.Integer, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    priority = db.Column(db.String(50), nullable=False)
+    action = db.Column(db.String(10), nullable=False)
+
+    def __repr__(self):
+        return f'<KeywordEvent {self.id} {self.action} {self.keyword}>'
+
+def _log_keyword_event(connection, keyword_id, keyword, priority, action):
+    connection.execute(KeywordEvent.__table__.insert().values(
+        keyword_id=keyword_id, keyword=keyword, priority=priority, action=action
+    ))
+
+@event.listens_for(Keyword, 'after_insert')
+def _keyword_added(mapper, connection, target):
+    _log_keyword_event(connection, target.id, target.keyword, target.priority, 'add')
+
+@event.listens_for(Keyword, 'after_update')
+def _keyword_changed(mapper, connection, target):
+    state = db.inspect(target)
+    keyword_history = state.attrs.keyword.history
+    priority_history = state.attrs.priority.history
+    if not keyword_history.has_changes() and not priority_history.has_changes():
+        return
+    old_keyword = keyword_history.deleted[0] if keyword_history.deleted else target.keyword
+    old_priority = priority_history.deleted[0] if priority_history.deleted else target.priority
+    _log_keyword_event(connection, target.id, old_keyword, old_priority, 'remove')
+    _log_keyword_event(connection, target.id, target.keyword, target.priority, 'add')
+
+@event.listens_for(Keyword, 'after_delete')
+def _keyword_removed(mapper, connection, target):
+    _log_keyword_event(connection, target.id, target.keyword, target.priority, 'remove')
+
+class AirtableRecord(db.Model):
+    term_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    record_id = db.Column(db.String(32), nullable=False, unique=True)
+    fields_hash = db.Column(db.String(64), nullable=True)
+
+    def __repr__(self):
+        return f'<AirtableRecord {self.term_id} {self.record_id}>'
+
+ACTIVE_JOB = "status IN ('queued', 'running')"
+
+class Job(db.Model):
+    __table_args__ = (
+        # At most one queued or running job of each kind, across processes.
+        db.Index('uq_job_active_kind', 'kind', unique=True,
+                 sqlite_where=db.text(ACTIVE_JOB), postgresql_where=db.text(ACTIVE_JOB)),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    params = db.Column(db.Text, nullable=True)
+    checkpoint = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    owner = db.Column(db.String(255), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
 class LegislativeBill(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('congress_id', 'legislative_id', name='uq_legislative_bill_congress_id_legislative_id'),
+        db.Index('ix_legislative_bill_legislative_id_congress_id', 'legislative_id', 'congress_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    legislative_id = db.Column(db.String(255), nullable=False, unique=True)
+    legislative_id = db.Column(db.Integer, nullable=False)
     summary = db.Column(db.Text, nullable=True)
     bill_name = db.Column(db.String(255), nullable=True)
     congress_id = db.Column(db.Integer, nullable=False)
-    text = db.Column(db.Text, nullable=True) 
+    text = db.deferred(db.Column(CompressedText, nullable=True))
     link = db.Column(db.Text, nullable=True)
     charcount = db.Column(db.Integer, nullable=True)
 
     def __repr__(self):
-        return f'<LegislativeBill {self.legislative_id}>'
\ No newline at end of file
+        return f'<LegislativeBill {self.legislative_id}>'
+
+class BillChunkSummary(db.Model):
+    key = db.Column(db.String(64), primary_key=True)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
+
+    def __repr__(self):
+        return f'<BillChunkSummary {self.key}>'
\ No newline at end of file
@@ -0,0 +1,30 @@
+from app.models import Term, Audit, db
+
+AUDIT_FIELDS = ['FAQ', 'Summary', 'Technical_Stuff', 'notes']
+
+
+def terms_with_audit(columns, include_audit=True):
+    """Query (id, *columns[, audit id, *AUDIT_FIELDS]) for every term, ordered by id.
+
+    Audits are outer-joined into the same SELECT, so callers get every term
+    and its audit in one round trip; only the listed columns are read.
+    """
+    selected = [Term.id] + [getattr(Term, column) for column in columns]
+    if include_audit:
+        selected += [Audit.id] + [getattr(Audit, field) for field in AUDIT_FIELDS]
+    query = db.session.query(*selected)
+    if include_audit:
+        query = query.outerjoin(Audit, Audit.id == Term.id)
+    return query.order_by(Term.id)
+
+
+def unpack_term_row(row, columns, include_audit=True):
+    """Split a terms_with_audit() row into (term dict, audit dict or None)."""
+    term = {"id": row[0]}
+    term.update(zip(columns, row[1:1 + len(columns)]))
+    audit = None
+    if include_audit:
+        values = row[1 + len(columns):]
+        if values[0] is not None:
+            audit = dict(zip(AUDIT_FIELDS, values[1:]))
+    return term, audit
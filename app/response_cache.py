@@ -0,0 +1,174 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+
+SKIPPED_HEADERS = {'Content-Length', 'Content-Type', 'ETag'}
+
+
+class CachedResponse:
+    def __init__(self, body, mimetype, headers, tags):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.tags = tags
+        self.etag = hashlib.sha1(body).hexdigest()
+
+    def to_response(self):
+        response = Response(self.body, mimetype=self.mimetype)
+        for name, value in self.headers:
+            response.headers[name] = value
+        response.set_etag(self.etag)
+        return response.make_conditional(request)
+
+
+class ResponseCache:
+    """In-process LRU cache of serialized GET responses.
+
+    Entries are keyed on the request path and query string and carry tags
+    such as 'terms' or 'term:12'; write paths call invalidate() with the tags
+    they affect. Bodies are served with strong ETags so clients can revalidate
+    with If-None-Match and get a 304. A streamed body of up to buffer_bytes is
+    read in full on a miss, so it gets its ETag on the first request; a larger
+    one is streamed through and cached as it goes, and carries an ETag only
+    from the next request on. The cache is per process, so every worker keeps
+    (and invalidates) its own copy.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, buffer_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        self.buffer_bytes = buffer_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', self.max_bytes)
+        self.buffer_bytes = app.config.get('RESPONSE_CACHE_BUFFER_BYTES', self.buffer_bytes)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, self._generation
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry, self._generation
+
+    def _put(self, key, entry, generation):
+        with self._lock:
+            if generation != self._generation or len(entry.body) > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, entry in self._entries.items() if entry.tags & tags]:
+                self._size -= len(self._entries.pop(key).body)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else None
+            }
+
+    def cached(self, tags, build):
+        key = request.full_path
+        entry, generation = self._get(key)
+        if entry is None:
+            response = current_app.make_response(build())
+            if response.status_code != 200:
+                return response
+            headers = [(name, value) for name, value in response.headers.items() if name not in SKIPPED_HEADERS]
+            if response.is_streamed:
+                head, rest = self._buffer(response.response)
+                if rest is not None:
+                    response.response = self._tee(key, head, rest, response.mimetype, headers, set(tags), generation)
+                    return response
+                body = b''.join(head)
+            else:
+                body = response.get_data()
+            entry = CachedResponse(body, response.mimetype, headers, set(tags))
+            self._put(key, entry, generation)
+        return entry.to_response()
+
+    def _buffer(self, chunks):
+        """Read a streamed body up to buffer_bytes; returns (chunks read, iterator of the rest or None if done)."""
+        head = []
+        size = 0
+        rest = iter(chunks)
+        for chunk in rest:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            head.append(chunk)
+            size += len(chunk)
+            if size > self.buffer_bytes:
+                return head, rest
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        return head, None
+
+    def _tee(self, key, head, chunks, mimetype, headers, tags, generation):
+        """Pass a streamed body (head already read) through unchanged, caching it once complete if it fits."""
+        size = sum(len(chunk) for chunk in head)
+        collected = list(head) if size <= self.max_bytes else None
+        try:
+            yield from head
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if collected is not None:
+                    size += len(chunk)
+                    if size <= self.max_bytes:
+                        collected.append(chunk)
+                    else:
+                        collected = None
+                yield chunk
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        if collected is not None:
+            self._put(key, CachedResponse(b''.join(collected), mimetype, headers, tags), generation)
+
+    def cached_view(self, *tag_templates):
+        """Cache a GET view. Tag templates are formatted with the view arguments, e.g. 'term:{id}'."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                tags = [template.format(**kwargs) for template in tag_templates]
+                return self.cached(tags, lambda: view(**kwargs))
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
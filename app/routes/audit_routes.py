@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from app.models import Term, Audit, db
+from app.response_cache import response_cache
 
 bp = Blueprint('audits', __name__)
 
@@ -14,6 +15,7 @@ def update_audit(id):
     audit.Technical_Stuff = data['auditData'].get('Technical_Stuff', audit.Technical_Stuff)
     audit.notes = data.get('notes', audit.notes)
     db.session.commit()
+    response_cache.invalidate('terms', f'term:{id}', f'audit:{id}')
     return jsonify({"message": "Audit updated successfully", "audit": {
         "id": audit.id,
         "FAQ": audit.FAQ,
@@ -23,6 +25,7 @@ def update_audit(id):
     }})
 
 @bp.route('/<int:id>', methods=['GET'])
+@response_cache.cached_view('audit', 'audit:{id}')
 def get_audit(id):
     audit = Audit.query.get_or_404(id)
     return jsonify({
@@ -54,6 +57,7 @@ def create_audit_with_id(id, data=None):
         )
         db.session.add(audit)
         db.session.commit()
+        response_cache.invalidate('terms', f'term:{term.id}', f'audit:{term.id}')
         return jsonify({"message": "Audit created successfully", "audit": {
             "id": audit.id,
             "FAQ": audit.FAQ,
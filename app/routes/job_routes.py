@@ -0,0 +1,63 @@
+from flask import Blueprint, jsonify, request
+from flask_cors import CORS
+from app.models import Job, db
+from app.jobs import job_runner
+
+bp = Blueprint('jobs', __name__)
+CORS(bp)
+
+
+def job_accepted(job, created):
+    """202 response for an endpoint that queued (or found already running) a background job."""
+    body = job_runner.describe(job)
+    body["job_id"] = job.id
+    body["status_url"] = f"/api/jobs/{job.id}"
+    body["message"] = f"Started {job.kind} job." if created else f"A {job.kind} job is already {job.status}."
+    return jsonify(body), 202
+
+
+def job_conflict(error):
+    """409 response for a request whose job kind is already active with other parameters."""
+    body = job_runner.describe(error.job)
+    body["job_id"] = error.job.id
+    body["status_url"] = f"/api/jobs/{error.job.id}"
+    body["message"] = str(error)
+    return jsonify(body), 409
+
+
+@bp.route('', methods=['GET'])
+def list_jobs():
+    query = Job.query
+    if request.args.get('kind'):
+        query = query.filter_by(kind=request.args['kind'])
+    if request.args.get('status'):
+        query = query.filter_by(status=request.args['status'])
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+    return jsonify([job_runner.describe(job) for job in jobs])
+
+
+@bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    return jsonify(job_runner.describe(job))
+
+
+@bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    try:
+        job_runner.cancel(job)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 409
+    return jsonify(job_runner.describe(job)), 202
+
+
+@bp.route('/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    try:
+        job_runner.resume(job)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 409
+    return job_accepted(job, True)
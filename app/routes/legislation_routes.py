@@ -1,22 +1,29 @@
 import logging
 from flask import Blueprint, jsonify, request, make_response
 from app.models import LegislativeBill, db
+from app.response_cache import response_cache
+from app.streaming import stream_json_array, stream_csv
+from app.llm import get_llm_client
+from app.llm_cache import llm_cache_requested
+from app.legislation import generate_bill, LegislationError
+from app.jobs import job_runner, JobConflict
+from app.search import search_index
+from app.routes.job_routes import job_accepted, job_conflict
 from flask_cors import CORS
 from dotenv import load_dotenv
-import os
-import openai
-import requests
-from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 bp = Blueprint('legislation', __name__)
 
+MAX_LEGISLATION_STAGE_CONCURRENCY = 16
+
 def create_error_response(message, status_code):
     response = make_response(jsonify({'error': message}), status_code)
     response.headers['Content-Type'] = 'application/json'
     return response
 
 @bp.route('/<int:congress_id>/<int:legislative_id>', methods=['GET'])
+@response_cache.cached_view('bill', 'bill:{congress_id}:{legislative_id}')
 def get_legislative_bill(congress_id, legislative_id):
     logger.debug(f"Fetching legislative bill with congress_id={congress_id}, legislative_id={legislative_id}")
     try:
@@ -72,6 +79,7 @@ def update_legislative_bill(congress_id, legislative_id):
 
     try:
         db.session.commit()
+        response_cache.invalidate('bills', f'bill:{congress_id}:{legislative_id}', f'bill:{bill.congress_id}:{bill.legislative_id}')
         logger.debug(f"Successfully updated legislative bill with id: {bill.id}")
     except Exception as e:
         logger.error(f"Error updating legislative bill: {e}")
@@ -115,10 +123,10 @@ def create_legislative_bill():
     link = data.get('link', '')
     charcount = len(text)  
 
-    existing_bill = LegislativeBill.query.filter_by(legislative_id=legislative_id).first()
+    existing_bill = LegislativeBill.query.filter_by(congress_id=congress_id, legislative_id=legislative_id).first()
     if existing_bill:
-        logger.error(f"Legislative bill with legislative_id {legislative_id} already exists")
-        return create_error_response(f"Legislative bill with legislative_id {legislative_id} already exists", 400)
+        logger.error(f"Legislative bill {congress_id}/{legislative_id} already exists")
+        return create_error_response(f"Legislative bill with legislative_id {legislative_id} already exists in congress {congress_id}", 400)
 
     if not bill_name:
         text_excerpt = text[:1000]
@@ -128,17 +136,7 @@ def create_legislative_bill():
         )
 
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=50,
-                temperature=0.7
-            )
-
-            bill_name = response['choices'][0]['message']['content'].strip()
+            bill_name = get_llm_client().chat(prompt, model="gpt-4-turbo", max_tokens=50, temperature=0.7, cache=llm_cache_requested())
         except Exception as e:
             logger.error(f"Error generating bill name: {e}")
             return create_error_response(f"Error generating bill name: {str(e)}", 500)
@@ -156,6 +154,7 @@ def create_legislative_bill():
     try:
         db.session.add(new_bill)
         db.session.commit()
+        response_cache.invalidate('bills')
         logger.debug(f"New legislative bill added to database with id: {new_bill.id}")
     except Exception as e:
         logger.error(f"Database error while adding new legislative bill: {e}")
@@ -175,53 +174,94 @@ def create_legislative_bill():
     response.headers['Content-Type'] = 'application/json'
     return response, 201
 
+BILL_SORT_KEYS = {
+    'congress_id': (LegislativeBill.congress_id, LegislativeBill.legislative_id),
+    'legislative_id': (LegislativeBill.legislative_id, LegislativeBill.congress_id),
+}
+
+def parse_bill_cursor(value):
+    """A bill cursor is "<congress_id>:<legislative_id>", the key of the last bill on the previous page."""
+    congress_id, legislative_id = value.split(':')
+    return {'congress_id': int(congress_id), 'legislative_id': int(legislative_id)}
+
 @bp.route('/bills', methods=['GET'])
+@response_cache.cached_view('bills')
 def get_all_legislative_bills():
     logger.debug("Fetching all legislative bills")
 
     sort_by = request.args.get('sort', default='congress_id')
     order = request.args.get('order', default='asc')
+    if sort_by not in BILL_SORT_KEYS:
+        sort_by = 'congress_id'
+    descending = order == 'desc'
 
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return create_error_response("limit must be a positive integer", 400)
     try:
-        if sort_by == 'congress_id':
-            if order == 'asc':
-                bills = LegislativeBill.query.order_by(LegislativeBill.congress_id.asc()).all()
-            else:
-                bills = LegislativeBill.query.order_by(LegislativeBill.congress_id.desc()).all()
-        elif sort_by == 'legislative_id':
-            if order == 'asc':
-                bills = LegislativeBill.query.order_by(LegislativeBill.legislative_id.asc()).all()
-            else:
-                bills = LegislativeBill.query.order_by(LegislativeBill.legislative_id.desc()).all()
-        else:
-            bills = LegislativeBill.query.all()
-
-        response = [
-            {
-                'bill_name': bill.bill_name,
-                'congress_id': bill.congress_id,
-                'legislative_id': bill.legislative_id,
-                'charcount': bill.charcount 
-            }
-            for bill in bills
-        ]
-        
-        logger.debug(f"Successfully fetched {len(response)} bills")
-        response_json = jsonify(response)
-        response_json.headers['Content-Type'] = 'application/json'
-        return response_json
+        after = parse_bill_cursor(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        return create_error_response("after must be a cursor of the form <congress_id>:<legislative_id>", 400)
+
+    try:
+        # Keyset pagination: both sort orders are backed by an index on their two key columns.
+        keys = BILL_SORT_KEYS[sort_by]
+        ordering = [key.desc() if descending else key.asc() for key in keys]
+        query = db.session.query(
+            LegislativeBill.bill_name,
+            LegislativeBill.congress_id,
+            LegislativeBill.legislative_id,
+            LegislativeBill.charcount
+        )
+        if after is not None:
+            position = db.tuple_(*keys)
+            last = db.tuple_(*[after[key.key] for key in keys])
+            query = query.filter(position < last if descending else position > last)
+        query = query.order_by(*ordering)
+
+        next_cursor = None
+        if limit:
+            # The page's last row and the one after it: a cursor only if there is a next page.
+            edge = query.with_entities(LegislativeBill.congress_id, LegislativeBill.legislative_id).offset(limit - 1).limit(2).all()
+            if len(edge) == 2:
+                next_cursor = f"{edge[0].congress_id}:{edge[0].legislative_id}"
+            query = query.limit(limit)
+
+        logger.debug(f"Streaming bills sorted by {sort_by} {order} (after={after}, limit={limit})")
+        response = stream_json_array(query.yield_per(200), lambda bill: {
+            'bill_name': bill.bill_name,
+            'congress_id': bill.congress_id,
+            'legislative_id': bill.legislative_id,
+            'charcount': bill.charcount
+        })
+        if next_cursor is not None:
+            response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+        return response
     
     except Exception as e:
         logger.error(f"Error fetching legislative bills: {e}")
         return create_error_response("Internal server error while fetching legislative bills", 500)
 
+BILL_EXPORT_FIELDS = ['id', 'congress_id', 'legislative_id', 'bill_name', 'summary', 'text', 'link', 'charcount']
+
+@bp.route('/bills/export.csv', methods=['GET'])
+def export_legislative_bills_csv():
+    logger.debug("Exporting all legislative bills as CSV")
+    query = db.session.query(*[getattr(LegislativeBill, field) for field in BILL_EXPORT_FIELDS]).order_by(
+        LegislativeBill.congress_id, LegislativeBill.legislative_id
+    )
+    return stream_csv(BILL_EXPORT_FIELDS, query.yield_per(200), 'all_bills.csv')
+
 @bp.route('/bills/clear', methods=['DELETE'])
 def clear_all_legislation():
     logger.debug("Clearing all legislative bills")
 
     try:
+        search_index.remove(db.session.connection(), 'bill')
         num_deleted = db.session.query(LegislativeBill).delete()
         db.session.commit()
+        response_cache.invalidate('bills', 'bill')
         logger.debug(f"Successfully deleted {num_deleted} bills")
         return jsonify({'message': f'Successfully deleted {num_deleted} bills'}), 200
     except Exception as e:
@@ -234,86 +274,11 @@ def clear_all_legislation():
 def generate_and_save_legislation(congress_id, legislative_id):
     logger.debug(f"Generating and saving legislation for congress_id={congress_id}, legislative_id={legislative_id}")
 
-    url = f"https://www.congress.gov/{congress_id}/bills/hr{legislative_id}/BILLS-{congress_id}hr{legislative_id}ih.xml"
-    logger.debug(f"Fetching data from URL: {url}")
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        response_text = response.text
-        if 'application/xml' in response.headers['Content-Type'] or 'text/xml' in response.headers['Content-Type']:
-            soup = BeautifulSoup(response_text, 'lxml') 
-            text = soup.get_text()
-        else:
-            text = response_text
-        text = text[:4000] if len(text) > 4000 else text
-    except requests.exceptions.HTTPError as http_err:
-        logger.error(f"HTTP error occurred: {http_err}")
-        return create_error_response(f"Error fetching data from URL: {http_err}", http_err.response.status_code)
-    except Exception as e:
-        logger.error(f"Error fetching data from URL: {e}")
-        return create_error_response("Error fetching data from URL", 500)
-
-    prompt_summary = (
-        f"Summarize the following legislative bill text: {text}. Provide an objective and informative description suitable for a public website. Avoid using any political bias and keep the description within 200 words."
-    )
-
-    try:
-        summary_response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt_summary}
-            ],
-            max_tokens=1500,
-            temperature=0.7
-        )
-
-        summary = summary_response['choices'][0]['message']['content'].strip()
-    except Exception as e:
-        logger.error(f"Error generating summary: {e}")
-        return create_error_response(f"Error generating summary: {str(e)}", 500)
-
-    text_excerpt = text[:3000]
-    prompt_title = (
-        f"Generate a concise and descriptive title for a legislative bill. The bill text excerpt is: \"{text_excerpt}\". "
-        "Provide a title that clearly and succinctly represents the main idea of the bill."
-    )
-
-    try:
-        title_response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt_title}
-            ],
-            max_tokens=150,
-            temperature=0.7
-        )
-
-        bill_name = title_response['choices'][0]['message']['content'].strip()
-    except Exception as e:
-        logger.error(f"Error generating bill name: {e}")
-        return create_error_response(f"Error generating bill name: {str(e)}", 500)
-
-    new_bill = LegislativeBill(
-        legislative_id=legislative_id,
-        summary=summary,
-        bill_name=bill_name,
-        congress_id=congress_id,
-        text=text,
-        link=url,
-        charcount=len(text)
-    )
-    
     try:
-        db.session.add(new_bill)
-        db.session.commit()
-        logger.debug(f"New legislative bill added to database with id: {new_bill.id}")
-    except Exception as e:
-        logger.error(f"Database error while adding new legislative bill: {e}")
-        db.session.rollback()
-        return create_error_response(f"Internal server error while creating new legislative bill: {str(e)}", 500)
+        new_bill = generate_bill(congress_id, legislative_id, cache=llm_cache_requested())
+    except LegislationError as e:
+        return create_error_response(e.message, e.status_code)
+    response_cache.invalidate('bills')
 
     response = jsonify({
         'id': new_bill.id,
@@ -327,6 +292,37 @@ def generate_and_save_legislation(congress_id, legislative_id):
     })
     response.headers['Content-Type'] = 'application/json'
     return response, 201
+
+@bp.route('/generate-legislation-range', methods=['POST'])
+def generate_legislation_range():
+    data = request.get_json() or {}
+    try:
+        congress_id = int(data.get('congress_id'))
+        start = int(data.get('legislative_id_start'))
+        end = int(data.get('legislative_id_end'))
+    except (ValueError, TypeError):
+        return create_error_response("congress_id, legislative_id_start and legislative_id_end must be integers", 400)
+    if start > end:
+        return create_error_response("legislative_id_start must not be greater than legislative_id_end", 400)
+
+    limits = {}
+    for stage in ('fetch', 'parse', 'summarize'):
+        value = data.get(f'{stage}_concurrency')
+        if value is None:
+            continue
+        try:
+            limits[f'{stage}_concurrency'] = max(1, min(int(value), MAX_LEGISLATION_STAGE_CONCURRENCY))
+        except (ValueError, TypeError):
+            return create_error_response(f"{stage}_concurrency must be an integer", 400)
+
+    try:
+        job, created = job_runner.submit('generate_legislation', congress_id=congress_id, start=start, end=end, **limits)
+    except JobConflict as e:
+        return job_conflict(e)
+    except Exception as e:
+        logger.error(f"Error starting legislation job: {e}")
+        return create_error_response(f"Error starting legislation job: {str(e)}", 500)
+    return job_accepted(job, created)
+
 CORS(bp)
-load_dotenv()
-openai.api_key = os.getenv('REACT_APP_API_KEY')
\ No newline at end of file
+load_dotenv()
\ No newline at end of file
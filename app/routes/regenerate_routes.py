@@ -1,20 +1,25 @@
+import csv
+import io
 import os
-import openai
 import logging
-from flask import Blueprint, jsonify, request
+import shutil
+import tempfile
+from flask import Blueprint, current_app, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
+from app.llm import get_llm_client
+from app.llm_cache import llm_cache_requested
+from app.streaming import stream_csv
+from app.term_generation import complete_csv_rows, completed_header
 
 load_dotenv()
 
 bp = Blueprint('regenerate', __name__)
 CORS(bp)
 
-openai.api_key = os.getenv('REACT_APP_API_KEY')
-
 logging.basicConfig(level=logging.DEBUG)
 
-if openai.api_key:
+if os.getenv('REACT_APP_API_KEY'):
     logging.debug("OpenAI API key loaded successfully.")
 else:
     logging.error("OpenAI API key not found. Please check your environment variables.")
@@ -30,18 +35,8 @@ def regenerate_text():
 
     try:
         logging.debug(f"Sending request to OpenAI with prompt: {prompt}")
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000, 
-            temperature=0.7
-        )
-
-        logging.debug(f"OpenAI response: {response}")
-        generated_text = response['choices'][0]['message']['content'].strip()
+        generated_text = get_llm_client().chat(prompt, model="gpt-4-turbo", max_tokens=1000, temperature=0.7, cache=llm_cache_requested())
+        logging.debug(f"OpenAI response: {generated_text}")
         return jsonify({'generated_text': generated_text})
     except Exception as e:
         logging.error(f"Error generating text: {str(e)}")
@@ -65,18 +60,8 @@ def generate_new_faq():
 
     try:
         logging.debug(f"Sending request to OpenAI with prompt: {prompt}")
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000, 
-            temperature=0.7
-        )
-
-        logging.debug(f"OpenAI response: {response}")
-        new_faq_text = response['choices'][0]['message']['content'].strip()
+        new_faq_text = get_llm_client().chat(prompt, model="gpt-4-turbo", max_tokens=1000, temperature=0.7, cache=llm_cache_requested())
+        logging.debug(f"OpenAI response: {new_faq_text}")
         try:
             question, answer = new_faq_text.split('@')
             question = question.strip()
@@ -88,3 +73,38 @@ def generate_new_faq():
     except Exception as e:
         logging.error(f"Error generating new FAQ: {str(e)}")
         return jsonify({'error': str(e)}), 500
+
+@bp.route('/bulk_upload', methods=['POST'])
+def bulk_upload():
+    """Return the uploaded CSV with missing summary, FAQ and keyword columns filled in.
+
+    Rows are generated concurrently and streamed back as they finish, so the
+    output order can differ from the input order.
+    """
+    upload = request.files.get('file')
+    if upload is None:
+        logging.error("No file provided")
+        return jsonify({'error': 'No file provided'}), 400
+
+    # Uploads are closed before a streamed response finishes, so keep a private copy on disk.
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(upload.stream, spool)
+    spool.seek(0)
+    text = io.TextIOWrapper(spool, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        text.close()
+        return jsonify({'error': 'The CSV file is empty'}), 400
+
+    concurrency = request.args.get('concurrency', current_app.config['BULK_TERM_CONCURRENCY'], type=int)
+    concurrency = max(1, min(concurrency, 16))
+    rows = complete_csv_rows(reader, concurrency=concurrency, cache=llm_cache_requested())
+
+    def completed_rows():
+        try:
+            yield from rows
+        finally:
+            rows.close()
+            text.close()
+
+    return stream_csv(completed_header(reader.fieldnames), completed_rows(), f"completed_{upload.filename or 'upload.csv'}", chunk_size=1)
@@ -0,0 +1,62 @@
+import logging
+from flask import Blueprint, jsonify, request
+from flask_cors import CORS
+from app.models import LegislativeBill, db
+from app.search import search_index, KINDS
+from app.jobs import job_runner
+from app.routes.job_routes import job_accepted
+
+bp = Blueprint('search', __name__)
+CORS(bp)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+@bp.route('', methods=['GET'])
+def search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"message": "q is required"}), 400
+    kind = request.args.get('type') or None
+    if kind is not None and kind not in KINDS:
+        return jsonify({"message": f"type must be one of: {', '.join(KINDS)}"}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int), 1), MAX_SEARCH_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+
+    try:
+        total, results = search_index.search(db.session.connection(), query, kind=kind, limit=limit, offset=offset)
+    except Exception as e:
+        logging.error(f"Search for {query!r} failed: {e}")
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+    # Bills are addressed by (congress_id, legislative_id) in the rest of the API.
+    bill_ids = [result["id"] for result in results if result["type"] == 'bill']
+    if bill_ids:
+        keys = {
+            row.id: row for row in db.session.query(
+                LegislativeBill.id, LegislativeBill.congress_id, LegislativeBill.legislative_id
+            ).filter(LegislativeBill.id.in_(bill_ids))
+        }
+        for result in results:
+            key = keys.get(result["id"]) if result["type"] == 'bill' else None
+            if key is not None:
+                result["congress_id"] = key.congress_id
+                result["legislative_id"] = key.legislative_id
+
+    next_offset = offset + limit if offset + limit < total else None
+    return jsonify({
+        "query": query,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": next_offset,
+        "ranked": search_index.enabled,
+        "results": results
+    })
+
+
+@bp.route('/rebuild', methods=['POST'])
+def rebuild_search_index():
+    job, created = job_runner.submit('rebuild_search_index')
+    return job_accepted(job, created)
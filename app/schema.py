@@ -0,0 +1,40 @@
+import logging
+
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+
+def prepare_schema(db, migrate):
+    """Make sure the database has the current tables before the app uses it; returns whether it does.
+
+    A new, empty database is created with create_all() and stamped with the
+    latest migration. Any other database is left to `flask db upgrade`:
+    create_all() would only add missing tables, never missing columns, and the
+    migrations creating those tables would then fail. Called when the app
+    starts serving, never from the CLI, so `flask db ...` runs on an
+    untouched database.
+    """
+    script = ScriptDirectory.from_config(migrate.get_config())
+    tables = db.inspect(db.engine).get_table_names()
+    if 'alembic_version' in tables:
+        with db.engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+        if current != set(script.get_heads()):
+            logging.warning(
+                f"Database schema is at revision {', '.join(sorted(current)) or 'base'}, "
+                f"not {', '.join(script.get_heads())}: run `flask db upgrade`"
+            )
+            return False
+        return True
+    if tables:
+        logging.warning(
+            "Database is not under migration control: stamp it with the revision its tables "
+            "match (`flask db stamp a697aab01023` for one created before migrations) and run `flask db upgrade`"
+        )
+        return False
+
+    db.create_all()
+    with db.engine.begin() as connection:
+        MigrationContext.configure(connection).stamp(script, 'head')
+    logging.info("Created database tables at the latest migration")
+    return True
@@ -0,0 +1,332 @@
+import logging
+import re
+
+from sqlalchemy import bindparam, event, select, text
+
+from app.jobs import job_runner, job_type
+from app.models import LegislativeBill, Term, db
+
+TERM_FAQ_FIELDS = [
+    'faqTitle', 'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+]
+TERM_INDEXED_FIELDS = ['name', 'response'] + TERM_FAQ_FIELDS
+BILL_INDEXED_FIELDS = ['bill_name', 'summary', 'text']
+
+# One FTS5 table holds both kinds; rowid = id * 2 + kind, so a match identifies its row.
+KINDS = {'term': 0, 'bill': 1}
+KIND_NAMES = {bit: kind for kind, bit in KINDS.items()}
+# bm25() weights for (title, body, extra): a hit in the name counts most.
+BM25_WEIGHTS = '10.0, 3.0, 1.0'
+INDEX_BATCH_SIZE = 500
+TOKEN = re.compile(r'\w+', re.UNICODE)
+# Contentless: the index keeps no copy of the (otherwise compressed) text, only its tokens.
+INDEX_TABLE = (
+    "CREATE VIRTUAL TABLE search_index USING fts5("
+    "title, body, extra, content = '', tokenize = 'porter unicode61')"
+)
+# Holds the few documents of one result page so FTS5 can highlight them. Long fields are
+# cut to SNIPPET_WINDOW characters around their first likely match before they go in.
+SNIPPET_WINDOW = 2000
+SNIPPET_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS temp.search_snippet USING fts5("
+    "title, body, extra, tokenize = 'porter unicode61')"
+)
+
+
+def fts_query(query, any_word=False):
+    """Turn free text into an FTS5 query: every word (or any_word) must match, the last one as a prefix."""
+    words = TOKEN.findall(query)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += '*'
+    return (' OR ' if any_word else ' ').join(quoted)
+
+
+def _window(value, query):
+    """Cut a long field to SNIPPET_WINDOW characters around the first place a query word may match.
+
+    Only a guess at where FTS5 will match: each word is looked for as a prefix
+    a few letters shorter than itself, to allow for stemming.
+    """
+    if not value or len(value) <= SNIPPET_WINDOW:
+        return value
+    prefixes = [word[:max(3, len(word) - 3)] for word in TOKEN.findall(query)]
+    found = re.search(r'\b(?:' + '|'.join(map(re.escape, prefixes)) + ')', value, re.IGNORECASE) if prefixes else None
+    start = max(0, found.start() - SNIPPET_WINDOW // 4) if found else 0
+    if start:
+        # Start on a word boundary so FTS5 does not see half a word.
+        space = value.find(' ', start)
+        start = space + 1 if 0 <= space < start + 100 else start
+    return value[start:start + SNIPPET_WINDOW]
+
+
+def fts5_available(connection):
+    return connection.dialect.name == 'sqlite' and bool(
+        connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+    )
+
+
+def create_index_table(connection):
+    """Create the search_index table, replacing one of an older layout; returns whether it was created."""
+    existing = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")).scalar()
+    if existing == INDEX_TABLE:
+        return False
+    if existing is not None:
+        connection.execute(text("DROP TABLE search_index"))
+    connection.execute(text(INDEX_TABLE))
+    return True
+
+
+def _rowid(kind, ref):
+    return ref * 2 + KINDS[kind]
+
+
+def _term_document(row):
+    faq = '\n'.join(filter(None, [getattr(row, field) for field in TERM_FAQ_FIELDS]))
+    return row.name, row.response, faq
+
+
+def _bill_document(row):
+    return row.bill_name, row.summary, row.text
+
+
+DOCUMENTS = {
+    'term': (Term, TERM_INDEXED_FIELDS, _term_document),
+    'bill': (LegislativeBill, BILL_INDEXED_FIELDS, _bill_document),
+}
+
+
+def _document_rows(connection, kind, ids=None):
+    """Yield batches of {rowid, title, body, extra} for rows of one kind, all of them when ids is None."""
+    model, fields, document = DOCUMENTS[kind]
+    table = model.__table__
+    # Select through the table so compressed columns come back as text.
+    query = select(table.c.id, *[table.c[field] for field in fields]).order_by(table.c.id).limit(INDEX_BATCH_SIZE)
+
+    def documents(rows):
+        return [
+            dict(zip(('title', 'body', 'extra'), document(row)), rowid=_rowid(kind, row.id))
+            for row in rows
+        ]
+
+    if ids is not None:
+        wanted = list(ids)
+        for start in range(0, len(wanted), INDEX_BATCH_SIZE):
+            rows = connection.execute(query.where(table.c.id.in_(wanted[start:start + INDEX_BATCH_SIZE]))).fetchall()
+            if rows:
+                yield documents(rows)
+        return
+    rows = connection.execute(query).fetchall()
+    while rows:
+        yield documents(rows)
+        rows = connection.execute(query.where(table.c.id > rows[-1].id)).fetchall()
+
+
+def _indexed(connection, rowids):
+    if not rowids:
+        return set()
+    rows = connection.execute(
+        text("SELECT id FROM search_index_docsize WHERE id IN :rowids").bindparams(bindparam('rowids', expanding=True)),
+        {"rowids": list(rowids)}
+    )
+    return {rowid for rowid, in rows}
+
+
+class SearchIndex:
+    """SQLite FTS5 index over term names, summaries and FAQs and bill names, summaries and text.
+
+    The index is contentless: it stores tokens and document sizes but no copy
+    of the text, which stays compressed in the term and bill tables. Snippets
+    for a page of results are made from those rows. A contentless FTS5 table
+    can only forget a document given the values it was indexed with, so
+    remove() must run before rows change or are deleted and index() after
+    they are written. ORM inserts, updates and deletes of terms and bills do
+    this through mapper hooks (SQL triggers could not read the compressed
+    columns); set-based writes that bypass the ORM must call them
+    themselves. The rebuild_search_index job rebuilds the index from
+    scratch. On databases other than SQLite with FTS5, search() falls back
+    to matching names with LIKE, without ranking or snippets.
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def init_app(self, app):
+        """Enable the index if the table exists or can be created; an empty index is filled by a background job."""
+        connection = db.session.connection()
+        if not fts5_available(connection):
+            logging.info("Full-text search index disabled: database is not SQLite with FTS5")
+            return
+        create_index_table(connection)
+        empty = connection.execute(text("SELECT 1 FROM search_index_docsize LIMIT 1")).first() is None
+        db.session.commit()
+        self.enabled = True
+        if empty and (db.session.query(Term.id).first() or db.session.query(LegislativeBill.id).first()):
+            job, created = job_runner.submit('rebuild_search_index')
+            logging.info(f"Search index is empty, building it in job {job.id}")
+
+    def index(self, connection, kind, ids=None):
+        """Add documents of one kind, all of them when ids is None; returns how many were added.
+
+        Rows already in the index are skipped; call remove() before changing them.
+        """
+        if not self.enabled:
+            return 0
+        count = 0
+        for documents in _document_rows(connection, kind, ids):
+            present = _indexed(connection, [document["rowid"] for document in documents])
+            documents = [document for document in documents if document["rowid"] not in present]
+            if documents:
+                connection.execute(
+                    text("INSERT INTO search_index (rowid, title, body, extra) VALUES (:rowid, :title, :body, :extra)"),
+                    documents
+                )
+                count += len(documents)
+        return count
+
+    def remove(self, connection, kind, ids=None):
+        """Take documents of one kind out of the index, all of them when ids is None.
+
+        Reads the rows as they are now, so call it before they are changed or deleted.
+        """
+        if not self.enabled:
+            return
+        for documents in _document_rows(connection, kind, ids):
+            present = _indexed(connection, [document["rowid"] for document in documents])
+            documents = [document for document in documents if document["rowid"] in present]
+            if documents:
+                connection.execute(
+                    text("INSERT INTO search_index (search_index, rowid, title, body, extra) "
+                         "VALUES ('delete', :rowid, :title, :body, :extra)"),
+                    documents
+                )
+
+    def rebuild(self, connection):
+        connection.execute(text("INSERT INTO search_index (search_index) VALUES ('delete-all')"))
+        return {kind: self.index(connection, kind) for kind in DOCUMENTS}
+
+    def search(self, connection, query, kind=None, limit=20, offset=0):
+        """Return (total matches, page of results) ranked by BM25, best first."""
+        if not self.enabled:
+            return self._search_names(connection, query, kind, limit, offset)
+        match = fts_query(query)
+        if match is None:
+            return 0, []
+        where = "search_index MATCH :match" + (" AND rowid % 2 = :bit" if kind else "")
+        params = {"match": match, "bit": KINDS.get(kind), "limit": limit, "offset": offset}
+        total = connection.execute(text(f"SELECT count(*) FROM search_index WHERE {where}"), params).scalar()
+        ranked = connection.execute(text(
+            f"SELECT rowid, bm25(search_index, {BM25_WEIGHTS}) AS score "
+            f"FROM search_index WHERE {where} ORDER BY score LIMIT :limit OFFSET :offset"
+        ), params).fetchall()
+        snippets = self._snippets(connection, query, [row.rowid for row in ranked])
+        results = []
+        for row in ranked:
+            title, title_highlight, snippet = snippets.get(row.rowid, (None, None, None))
+            results.append({
+                "type": KIND_NAMES[row.rowid % 2],
+                "id": row.rowid // 2,
+                "title": title,
+                "title_highlight": title_highlight,
+                "snippet": snippet,
+                "score": -row.score
+            })
+        return total, results
+
+    def _snippets(self, connection, query, rowids):
+        """Map rowid to (title, highlighted title, snippet), made from the current term and bill rows.
+
+        FTS5 only sees the title and a window of each long field, so
+        highlighting a page costs the same for a short term and a long bill.
+        """
+        if not rowids:
+            return {}
+        documents = []
+        for kind, bit in KINDS.items():
+            ids = [rowid // 2 for rowid in rowids if rowid % 2 == bit]
+            if ids:
+                for batch in _document_rows(connection, kind, ids):
+                    documents.extend(batch)
+        for document in documents:
+            document["body"] = _window(document["body"], query)
+            document["extra"] = _window(document["extra"], query)
+        snippets = {document["rowid"]: (document["title"], document["title"], None) for document in documents}
+        connection.execute(text(SNIPPET_TABLE))
+        connection.execute(text("DELETE FROM temp.search_snippet"))
+        if documents:
+            connection.execute(
+                text("INSERT INTO temp.search_snippet (rowid, title, body, extra) VALUES (:rowid, :title, :body, :extra)"),
+                documents
+            )
+        # Any word: a window may not hold every word that matched in the whole document.
+        rows = connection.execute(text(
+            "SELECT rowid, title, "
+            "highlight(search_snippet, 0, '<mark>', '</mark>') AS title_highlight, "
+            "snippet(search_snippet, -1, '<mark>', '</mark>', '…', 24) AS snippet "
+            "FROM temp.search_snippet WHERE search_snippet MATCH :match"
+        ), {"match": fts_query(query, any_word=True)}).fetchall()
+        connection.execute(text("DELETE FROM temp.search_snippet"))
+        snippets.update({row.rowid: (row.title, row.title_highlight, row.snippet) for row in rows})
+        return snippets
+
+    def _search_names(self, connection, query, kind, limit, offset):
+        pattern = f"%{query.strip()}%"
+        if not query.strip():
+            return 0, []
+        selects = []
+        if kind in (None, 'term'):
+            selects.append(select(db.literal('term').label('kind'), Term.id.label('ref'), Term.name.label('title'))
+                           .where(Term.name.ilike(pattern)))
+        if kind in (None, 'bill'):
+            selects.append(select(db.literal('bill').label('kind'), LegislativeBill.id.label('ref'), LegislativeBill.bill_name.label('title'))
+                           .where(LegislativeBill.bill_name.ilike(pattern)))
+        matches = db.union_all(*selects).subquery()
+        total = connection.execute(select(db.func.count()).select_from(matches)).scalar()
+        rows = connection.execute(select(matches).order_by(matches.c.title).limit(limit).offset(offset)).fetchall()
+        return total, [
+            {"type": row.kind, "id": row.ref, "title": row.title, "title_highlight": row.title, "snippet": None, "score": None}
+            for row in rows
+        ]
+
+
+search_index = SearchIndex()
+
+
+def _register_hooks(model, kind, fields):
+    def changed(target):
+        state = db.inspect(target)
+        return any(state.attrs[field].history.has_changes() for field in fields)
+
+    @event.listens_for(model, 'after_insert')
+    def _indexed_insert(mapper, connection, target):
+        search_index.index(connection, kind, [target.id])
+
+    @event.listens_for(model, 'before_update')
+    def _unindexed_update(mapper, connection, target):
+        if changed(target):
+            search_index.remove(connection, kind, [target.id])
+
+    @event.listens_for(model, 'after_update')
+    def _indexed_update(mapper, connection, target):
+        if changed(target):
+            search_index.index(connection, kind, [target.id])
+
+    @event.listens_for(model, 'before_delete')
+    def _unindexed_delete(mapper, connection, target):
+        search_index.remove(connection, kind, [target.id])
+
+
+_register_hooks(Term, 'term', TERM_INDEXED_FIELDS)
+_register_hooks(LegislativeBill, 'bill', BILL_INDEXED_FIELDS)
+
+
+@job_type('rebuild_search_index')
+def rebuild_search_index_job(ctx):
+    """Rebuild the full-text search index from the term and bill tables."""
+    if not search_index.enabled:
+        return {"enabled": False}
+    counts = search_index.rebuild(db.session.connection())
+    ctx.checkpoint()
+    return counts
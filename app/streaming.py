@@ -0,0 +1,74 @@
+import csv
+import io
+import logging
+
+from flask import Response, current_app, stream_with_context
+
+
+def stream_json_array(rows, serialize, chunk_size=100):
+    """Stream rows as a JSON array without building the whole list in memory.
+
+    rows is any iterable, normally a query using yield_per(); serialize turns
+    one row into a JSON-compatible value. Items are encoded with the app's
+    JSON provider and flushed chunk_size at a time.
+    """
+    def generate():
+        dumps = current_app.json.dumps
+        separator = '['
+        buffer = []
+        try:
+            for row in rows:
+                buffer.append(dumps(serialize(row)))
+                if len(buffer) >= chunk_size:
+                    yield separator + ','.join(buffer)
+                    separator = ','
+                    buffer = []
+        except Exception as e:
+            logging.error(f"Error while streaming JSON array: {e}")
+            raise
+        if buffer:
+            yield separator + ','.join(buffer)
+            separator = ','
+        yield '[]' if separator == '[' else ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def stream_csv(header, rows, filename, chunk_size=100):
+    """Stream rows (sequences matching header) as a CSV attachment."""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        try:
+            for count, row in enumerate(rows, 1):
+                writer.writerow(row)
+                if count % chunk_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        except Exception as e:
+            logging.error(f"Error while streaming CSV {filename}: {e}")
+            raise
+        yield buffer.getvalue()
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_events(events):
+    """Stream (event name, data) pairs as server-sent events, data encoded as JSON."""
+    def generate():
+        dumps = current_app.json.dumps
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {dumps(data)}\n\n"
+        except Exception as e:
+            logging.error(f"Error while streaming events: {e}")
+            yield f"event: error\ndata: {dumps({'message': str(e)})}\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,279 @@
+import csv
+import logging
+import re
+from types import SimpleNamespace
+
+from sqlalchemy.exc import IntegrityError
+
+from app.keyword_sync import (
+    current_matcher, index_term, term_texts,
+    FINGERPRINT_FIELDS, TERM_KEYWORD_COLUMNS, FAQ_KEYWORD_COLUMNS,
+)
+from app.llm import completed_in_window, get_llm_client
+from app.models import Term, Keyword, db
+from app.response_cache import response_cache
+
+BULK_COLUMNS = ['name', 'type', 'additional_keywords', 'priority', 'custom_prompt']
+
+FAQ_FIELDS = [
+    'faqTitle',
+    'faqQ1', 'faqA1', 'faqQ2', 'faqA2', 'faqQ3',
+    'faqA3', 'faqQ4', 'faqA4', 'faqQ5', 'faqA5',
+]
+
+
+def generate_prompt(keyword, term_type, additional_keywords):
+    additional_text = f" Try to include these words: {additional_keywords}."
+    if term_type == 'countries':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 purely informational words providing an overview and one paragraph history of {keyword}. Use this format: [overview, history, economic importance, political background/importance, key political and notable figures]. Do not include a summary. Do not use bullet points. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'cities':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write a 300 word article which is purely informational providing an overview, history and the global significance of {keyword}. Make sure to talk about its important political, economic and historical factors while remaining unbiased and factual. Do not use bullet points. Do not include a conclusion paragraph. Follow this structure: [overview, history, political, economic, historical, global significance/place in modern world]. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'scientists':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and the accomplishments of {keyword}. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'first ladies':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and the accomplishments of {keyword}. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'notable people':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and the accomplishments of {keyword}. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'military conflicts':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and history of {keyword}, including key events and major players. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'person':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and the accomplishments of {keyword} that highlight key issues and accomplishments of their political career. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'political events':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 words providing an overview and history of {keyword}, including its key issues and outcomes. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    elif term_type == 'us laws':
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Write 300 purely informational words providing an overview and history of the {keyword} law, including its key provisions and impact. Do not use bullet points. Do not include a conclusion paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    else:
+        return f'You are an unbiased news reporter working for C-SPAN writing a summary of {keyword} for the website. Adhering to AP Style guidelines, write 300 purely informational words providing an overview and history of {keyword}. Do not use bullet points. Do not include a conclusion or summary paragraph. Use journalism grammar and avoid idiomatic language or exaggerations.' + additional_text
+    
+def generate_faq_prompt(keyword):
+    return (f'You are an unbiased impartial C-Span Journalist. Provide a detailed objective, factual, and unbiased FAQ '
+            f'about {keyword}. Do 5 FAQs, start with "Frequently Asked Questions about the {keyword}", end the title starting line '
+            f'with a "*", separate each question from answer with a ~. Separate each of the 5 entries with a "///". '
+            f'The title sentence does not need any separation besides a "*" from the first question. '
+            f'Do not number the questions and no "-", just write out each with the separation points "///" and "~" accordingly. '
+            f'Should be less than 250 words.')
+
+def ensure_question_format(text):
+    text = re.sub(r'\?~', '? *', text)  
+    text = re.sub(r'\? ~', '? *', text) 
+    text = re.sub(r'(\?)(?!~|\*)', r'\1 *', text) 
+    return text
+
+def clean_text(text):
+    text = re.sub(r'[\'"]', '', text) 
+    text = re.sub(r'\b\d+\.\)', '', text) 
+    text = re.sub(r'\* ~', '*', text)
+    text = re.sub(r'/// ~', '*', text)
+    text = re.sub(r'\* ///', '*', text)
+    text = re.sub(r'///', '*', text) 
+    text = re.sub(r'~', '*', text) 
+    text = ensure_question_format(text)
+    text = re.sub(r'\* \*', '*', text) 
+    return text
+
+def parse_faq_content(faq):
+    faq = clean_text(faq)
+    parts = faq.split('*')
+    items = [part.strip() for part in parts if part.strip()]
+    return items
+
+
+def build_term(term_id, name, summary_prompt, summary_response, faq_response):
+    faq_items = parse_faq_content(faq_response)
+    logging.info(f"FAQ items: {faq_items}")
+    faq = {field: faq_items[i] if len(faq_items) > i else '' for i, field in enumerate(FAQ_FIELDS)}
+    return Term(id=term_id, name=name, prompt=summary_prompt, response=summary_response, **faq)
+
+
+def parse_bulk_rows(lines):
+    """Yield (row number, row) for every non-blank CSV row of term, type, keywords, priority, custom prompt."""
+    for number, values in enumerate(csv.reader(lines), 1):
+        values = [value.strip() for value in values]
+        if not any(values):
+            continue
+        values += [''] * (len(BULK_COLUMNS) - len(values))
+        yield number, dict(zip(BULK_COLUMNS, values))
+
+
+def bulk_generate_terms(rows, concurrency=4, batch_size=20, cache=True):
+    """Generate terms for (row number, row) pairs with up to concurrency rows in flight.
+
+    Yields one result per row ('created', 'skipped' or 'failed'); created rows
+    are reported once their batch of batch_size terms has been committed.
+    Rows finish in whatever order the model answers. If the consumer stops
+    early, rows already in flight are still saved, but no new rows are started.
+    Ids are assigned from max(Term.id) when a batch is written, not when the
+    run starts, so terms created meanwhile elsewhere do not collide with it;
+    a batch that still loses a race for its ids is retried once.
+    """
+    llm = get_llm_client()
+    names = {name.lower() for name, in db.session.query(Term.name)}
+    keywords = {keyword.lower() for keyword, in db.session.query(Keyword.keyword)}
+    matcher = current_matcher()
+    batch = []
+
+    def result(entry, status, **extra):
+        return {"row": entry["row"], "name": entry["name"], "status": status, **extra}
+
+    def checked(rows):
+        for number, row in rows:
+            entry = {"row": number, "name": row['name'], "fields": row, "status": None}
+            name = row['name'].lower()
+            if not row['name'] or not row['priority']:
+                entry.update(status='failed', message="Name and priority are required")
+            elif name in names:
+                entry.update(status='skipped', message="A term with this name already exists")
+            elif name in keywords:
+                entry.update(status='failed', message="A keyword with this name already exists")
+            else:
+                names.add(name)
+                keywords.add(name)
+            yield entry
+
+    def submit(entry):
+        if entry["status"]:
+            return None
+        row = entry["fields"]
+        entry["prompt"] = row['custom_prompt'] or generate_prompt(row['name'], row['type'] or 'other', row['additional_keywords'])
+        return [
+            llm.submit(entry["prompt"], cache=cache),
+            llm.submit(generate_faq_prompt(row['name']), cache=cache),
+        ]
+
+    def write_batch():
+        next_id = (db.session.query(db.func.max(Term.id)).scalar() or 0) + 1
+        for offset, (entry, term) in enumerate(batch):
+            term.id = next_id + offset
+            db.session.add(term)
+            db.session.add(Keyword(keyword=term.name, priority=entry["fields"]['priority'], term_id=term.id))
+        db.session.flush()
+        for entry, term in batch:
+            index_term(term, matcher)
+        db.session.commit()
+
+    def flush():
+        nonlocal batch
+        if not batch:
+            return []
+        try:
+            try:
+                write_batch()
+            except IntegrityError as e:
+                db.session.rollback()
+                logging.warning(f"Bulk term batch conflicted with a concurrent write, retrying: {e}")
+                write_batch()
+            results = [result(entry, 'created', id=term.id) for entry, term in batch]
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error committing bulk term batch: {e}")
+            results = [result(entry, 'failed', message=f"An error occurred: {str(e)}") for entry, _ in batch]
+        batch = []
+        response_cache.invalidate('terms')
+        return results
+
+    def complete(entry, futures):
+        try:
+            summary_response, faq_response = [future.result() for future in futures]
+        except Exception as e:
+            logging.error(f"Error generating term {entry['name']}: {e}")
+            return [result(entry, 'failed', message=str(e))]
+
+        row = entry["fields"]
+        batch.append((entry, build_term(None, row['name'], entry["prompt"], summary_response, faq_response)))
+        return flush() if len(batch) >= batch_size else []
+
+    window = completed_in_window(checked(rows), submit, concurrency, on_close=complete)
+    try:
+        for entry, futures in window:
+            if futures is None:
+                yield result(entry, entry["status"], message=entry["message"])
+            else:
+                yield from complete(entry, futures)
+        yield from flush()
+    finally:
+        window.close()
+        if batch:
+            logging.warning(f"Bulk term generation stopped early; saving {len(batch)} generated terms")
+            flush()
+
+
+KEYWORD_COLUMNS = list(TERM_KEYWORD_COLUMNS.values()) + list(FAQ_KEYWORD_COLUMNS.values())
+
+COMPLETED_COLUMNS = ['prompt', 'response'] + FAQ_FIELDS + KEYWORD_COLUMNS
+
+COLUMN_ALIASES = {
+    'name': ('name', 'term', 'term name'),
+    'type': ('type',),
+    'additional_keywords': ('additional_keywords', 'additional keywords', 'keywords'),
+    'custom_prompt': ('custom_prompt', 'custom prompt'),
+}
+
+
+def _find_column(header, field):
+    lowered = {column.strip().lower(): column for column in header}
+    for alias in COLUMN_ALIASES[field]:
+        if alias in lowered:
+            return lowered[alias]
+    return None
+
+
+def completed_header(header):
+    """The input header plus every generated column it lacks and an error column."""
+    return list(header) + [column for column in COMPLETED_COLUMNS + ['error'] if column not in header]
+
+
+def complete_csv_rows(reader, concurrency=4, cache=True):
+    """Fill in missing summary, FAQ and keyword columns of csv.DictReader rows.
+
+    The summary and FAQ are generated only when the row has none; keyword
+    columns are matched against the keyword table when all of them are empty.
+    Up to concurrency rows are generated at once and rows are yielded as
+    lists in completed_header() order as soon as they are finished.
+    """
+    llm = get_llm_client()
+    matcher = current_matcher()
+    header = completed_header(reader.fieldnames or [])
+    columns = {field: _find_column(reader.fieldnames or [], field) for field in COLUMN_ALIASES}
+
+    def value(row, field):
+        column = columns[field]
+        return (row.get(column) or '').strip() if column else ''
+
+    def submit(row):
+        name = value(row, 'name')
+        if not name:
+            return None
+        futures = {}
+        if not row.get('response'):
+            row['prompt'] = row.get('prompt') or value(row, 'custom_prompt') or generate_prompt(name, value(row, 'type') or 'other', value(row, 'additional_keywords'))
+            futures['summary'] = llm.submit(row['prompt'], cache=cache)
+        if not any(row.get(field) for field in FAQ_FIELDS):
+            futures['faq'] = llm.submit(generate_faq_prompt(name), cache=cache)
+        row['_futures'] = futures
+        return list(futures.values())
+
+    def complete(row):
+        errors = []
+        for kind, future in row.pop('_futures', {}).items():
+            try:
+                reply = future.result()
+            except Exception as e:
+                errors.append(f"{kind}: {e}")
+                continue
+            if kind == 'summary':
+                row['response'] = reply
+            else:
+                row.update(zip(FAQ_FIELDS, parse_faq_content(reply)))
+        name = value(row, 'name')
+        if name and not any(row.get(column) for column in KEYWORD_COLUMNS):
+            summary_texts, faq_answers = term_texts(SimpleNamespace(**{field: row.get(field) for field in FINGERPRINT_FIELDS}))
+            for columns_by_priority, found in ((TERM_KEYWORD_COLUMNS, matcher.match(*summary_texts, exclude=name)),
+                                               (FAQ_KEYWORD_COLUMNS, matcher.match(faq_answers, exclude=name))):
+                for priority, column in columns_by_priority.items():
+                    row[column] = ", ".join(found.get(priority, []))
+        if errors:
+            row['error'] = "; ".join(errors)
+        return [row.get(column) or '' for column in header]
+
+    for row, _ in completed_in_window(reader, submit, concurrency):
+        yield complete(row)
@@ -0,0 +1,97 @@
+"""Compare BeautifulSoup get_text() with the streaming bill parser on a large bill.
+
+Run from the repository root:
+
+    python -m benchmarks.bill_parsing --sections 3000
+    python -m benchmarks.bill_parsing --file BILLS-118hr2882enr.xml
+
+Each parser runs in a forked process so its peak RSS can be reported separately.
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import string
+import time
+
+from bs4 import BeautifulSoup
+
+from app.bill_parser import parse_bill_xml
+
+
+def make_bill(num_sections, seed):
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(5000)]
+
+    def sentence(words):
+        return ' '.join(rng.choices(vocabulary, k=words)).capitalize() + '.'
+
+    parts = [
+        '<?xml version="1.0"?>\n<!DOCTYPE bill PUBLIC "-//US Congress//DTDs/bill.dtd//EN" "bill.dtd">\n<bill>',
+        '<metadata><dublinCore><dc:title xmlns:dc="http://purl.org/dc/elements/1.1/">Benchmark bill</dc:title></dublinCore></metadata>',
+        f'<form><legis-num>H. R. 1</legis-num><official-title>{sentence(20)}</official-title></form><legis-body>',
+    ]
+    for number in range(1, num_sections + 1):
+        parts.append(f'<section id="S{number}"><enum>{number}.</enum><header>{sentence(5)}</header>')
+        for letter in 'abcd':
+            parts.append(f'<subsection id="S{number}{letter}"><enum>({letter})</enum><header>{sentence(3)}</header><text>{sentence(60)}</text>')
+            for item in range(1, 4):
+                parts.append(f'<paragraph><enum>({item})</enum><text>{sentence(40)}</text></paragraph>')
+            parts.append('</subsection>')
+        parts.append('</section>')
+    parts.append('</legis-body></bill>')
+    return ''.join(parts).encode('utf-8')
+
+
+def soup_text(content, max_chars):
+    return BeautifulSoup(content, 'lxml').get_text()[:max_chars]
+
+
+def streaming_text(content, max_chars):
+    return parse_bill_xml(content, max_chars=max_chars).text[:max_chars]
+
+
+def measure(fn, content, max_chars, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    fn(content, max_chars)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before))
+
+
+def run(fn, content, max_chars):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(fn, content, max_chars, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, default=3000)
+    parser.add_argument('--file', help='parse this bill XML file instead of a generated one')
+    parser.add_argument('--max-chars', type=int, default=4000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'rb') as f:
+            content = f.read()
+    else:
+        content = make_bill(args.sections, args.seed)
+
+    print(f"bill: {len(content) / 1024 / 1024:.1f} MB, first {args.max_chars} characters")
+    for name, fn, max_chars in [
+        ('BeautifulSoup get_text', soup_text, args.max_chars),
+        ('streaming, early stop', streaming_text, args.max_chars),
+        ('streaming, whole bill', streaming_text, None),
+    ]:
+        seconds, peak_kb = run(fn, content, max_chars)
+        print(f"{name:24} {seconds * 1000:9.1f} ms  peak RSS +{peak_kb / 1024:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Compare the per-keyword sync loop with the compiled KeywordMatcher.
+
+Run from the repository root:
+
+    python -m benchmarks.keyword_matching --keywords 3000 --terms 1100
+
+or as a script, python benchmarks/keyword_matching.py.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from types import SimpleNamespace
+
+if __package__ in (None, ''):
+    # Run as a script: make the repository root importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.keyword_matcher import KeywordMatcher
+from app.keyword_sync import term_texts
+
+
+def legacy_extract_keywords_from_text(text, keywords, priority, term_name):
+    extracted_keywords = []
+    for keyword in keywords:
+        if keyword.keyword.lower() in text.lower() and keyword.priority.lower() == priority and keyword.keyword.lower() != term_name.lower():
+            extracted_keywords.append(keyword.keyword)
+    return extracted_keywords
+
+
+def legacy_extract_keywords_from_faq_answers(term, keywords, priority, term_name):
+    extracted_keywords = []
+    for answer in [term.faqA1, term.faqA2, term.faqA3, term.faqA4, term.faqA5]:
+        if answer:
+            for keyword in keywords:
+                if keyword.keyword.lower() in answer.lower() and keyword.priority.lower() == priority and keyword.keyword.lower() != term_name.lower():
+                    extracted_keywords.append(keyword.keyword)
+    return extracted_keywords
+
+
+def legacy_sync(terms, keywords):
+    """The sync_keywords loop as it was; returns (term keywords, FAQ keywords) sets per term."""
+    found = []
+    for term in terms:
+        # Same fields as the old sync_keywords route.
+        faq_content = " ".join(filter(None, [
+            term.faqTitle, term.faqQ1, term.faqA1,
+            term.faqQ2, term.faqA2, term.faqQ3,
+            term.faqA3, term.faqQ4, term.faqA4,
+            term.faqQ5, term.faqA5
+        ]))
+        term_keywords, faq_keywords = set(), set()
+        for priority in ('high', 'medium', 'low'):
+            term_keywords.update(legacy_extract_keywords_from_text(term.response, keywords, priority, term.name))
+            term_keywords.update(legacy_extract_keywords_from_text(faq_content, keywords, priority, term.name))
+            faq_keywords.update(legacy_extract_keywords_from_faq_answers(term, keywords, priority, term.name))
+        found.append((term_keywords, faq_keywords))
+    return found
+
+
+def matcher_sync(terms, keywords):
+    """What sync_term_keywords() runs per term; returns (term keywords, FAQ keywords) sets per term."""
+    matcher = KeywordMatcher(keywords)
+    found = []
+    for term in terms:
+        summary_texts, faq_answers = term_texts(term)
+        term_keywords = matcher.match(*summary_texts, exclude=term.name)
+        faq_keywords = matcher.match(faq_answers, exclude=term.name)
+        found.append((
+            {keyword for hits in term_keywords.values() for keyword in hits},
+            {keyword for hits in faq_keywords.values() for keyword in hits},
+        ))
+    return found
+
+
+def make_corpus(num_keywords, num_terms, seed):
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(20000)]
+    keywords = []
+    seen = set()
+    while len(keywords) < num_keywords:
+        phrase = ' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))).title()
+        if phrase.lower() in seen:
+            continue
+        seen.add(phrase.lower())
+        keywords.append(SimpleNamespace(id=len(keywords) + 1, keyword=phrase, priority=rng.choice(['High', 'Medium', 'Low'])))
+
+    def paragraph(words):
+        tokens = rng.choices(vocabulary, k=words)
+        for _ in range(words // 40):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(keywords).keyword)
+        return ' '.join(tokens)
+
+    terms = [
+        SimpleNamespace(
+            name=keywords[i % len(keywords)].keyword,
+            response=paragraph(300),
+            faqTitle=paragraph(8),
+            faqQ1=paragraph(12), faqQ2=paragraph(12), faqQ3=paragraph(12),
+            faqQ4=paragraph(12), faqQ5=paragraph(12),
+            faqA1=paragraph(40), faqA2=paragraph(40), faqA3=paragraph(40),
+            faqA4=paragraph(40), faqA5=paragraph(40),
+        )
+        for i in range(num_terms)
+    ]
+    return terms, keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keywords', type=int, default=3000)
+    parser.add_argument('--terms', type=int, default=1100)
+    parser.add_argument('--legacy-terms', type=int, default=50,
+                        help='terms to time with the legacy loop; the result is extrapolated to --terms')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    terms, keywords = make_corpus(args.keywords, args.terms, args.seed)
+
+    start = time.perf_counter()
+    matched = matcher_sync(terms, keywords)
+    matcher_seconds = time.perf_counter() - start
+
+    sample = terms[:min(args.legacy_terms, len(terms))]
+    start = time.perf_counter()
+    legacy = legacy_sync(sample, keywords)
+    legacy_seconds = (time.perf_counter() - start) * len(terms) / len(sample)
+
+    print(f"{args.keywords} keywords, {args.terms} terms")
+    print(f"legacy loop:     {legacy_seconds:8.2f} s (extrapolated from {len(sample)} terms)")
+    print(f"KeywordMatcher:  {matcher_seconds:8.2f} s (including automaton build)")
+    print(f"speedup:         {legacy_seconds / matcher_seconds:8.1f}x")
+
+    # The matcher only takes whole words, so it finds a subset of the old substring matches.
+    missing = sum(len(new - old) for found_new, found_old in zip(matched, legacy) for new, old in zip(found_new, found_old))
+    inside_words = sum(len(old - new) for found_new, found_old in zip(matched, legacy) for new, old in zip(found_new, found_old))
+    print(f"parity:          {missing} matcher-only keywords, {inside_words} legacy matches inside other words "
+          f"(over {len(sample)} terms)")
+    if missing:
+        raise SystemExit("KeywordMatcher found keywords the legacy loop did not")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Time full-text searches against an FTS5 search index of synthetic terms and bills.
+
+Run from the repository root:
+
+    python -m benchmarks.search --documents 100000
+
+Synthetic terms and bills are written to the term and legislative_bill tables
+of an in-memory SQLite database and indexed with SearchIndex.index(), so the
+timings include loading and highlighting each result page from those rows.
+"""
+import argparse
+import itertools
+import random
+import string
+import time
+
+from sqlalchemy import create_engine
+
+from app.models import LegislativeBill, Term, db
+from app.search import create_index_table, search_index
+
+
+def make_vocabulary(seed, size=20000):
+    rng = random.Random(seed)
+    return [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_documents(vocabulary, count, seed):
+    rng = random.Random(seed)
+    # Zipf-like word frequencies, so some words are common and most are rare, as in real text.
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(n):
+        return ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=n))
+
+    for ref in range(1, count + 1):
+        name = f"{words(rng.randint(2, 8))} {ref}"
+        if ref % 10 == 0:
+            yield 'bill', {
+                "id": ref, "congress_id": 118, "legislative_id": ref,
+                "bill_name": name, "summary": words(150), "text": words(2000)
+            }
+        else:
+            yield 'term', {"id": ref, "name": name, "response": words(150), "faqTitle": words(200)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    tables = {'term': Term.__table__, 'bill': LegislativeBill.__table__}
+    with engine.begin() as connection:
+        db.metadata.create_all(connection, tables=list(tables.values()))
+        create_index_table(connection)
+        vocabulary = make_vocabulary(args.seed)
+        batches = {kind: [] for kind in tables}
+        for kind, row in make_documents(vocabulary, args.documents, args.seed):
+            batches[kind].append(row)
+            if len(batches[kind]) == 1000:
+                connection.execute(tables[kind].insert(), batches.pop(kind))
+                batches[kind] = []
+        for kind, rows in batches.items():
+            if rows:
+                connection.execute(tables[kind].insert(), rows)
+
+        search_index.enabled = True
+        start = time.perf_counter()
+        counts = {kind: search_index.index(connection, kind) for kind in tables}
+        print(f"indexed {counts} in {time.perf_counter() - start:.1f} s")
+        rng = random.Random(args.seed + 1)
+        for name, pick in [
+            ('common word', lambda: vocabulary[rng.randint(0, 20)]),
+            ('rare word', lambda: vocabulary[rng.randint(1000, 19999)]),
+            ('two words', lambda: f"{vocabulary[rng.randint(0, 200)]} {vocabulary[rng.randint(0, 200)]}"),
+            ('prefix', lambda: vocabulary[rng.randint(0, 2000)][:3]),
+        ]:
+            timings, totals = [], []
+            for _ in range(args.queries):
+                query = pick()
+                start = time.perf_counter()
+                total, _ = search_index.search(connection, query, limit=20)
+                timings.append(time.perf_counter() - start)
+                totals.append(total)
+            timings.sort()
+            median = timings[len(timings) // 2] * 1000
+            p95 = timings[int(len(timings) * 0.95)] * 1000
+            print(f"{name:12} median {median:7.2f} ms  p95 {p95:7.2f} ms  ({sum(totals) // len(totals)} matches on average)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""keyword sync state
+
+Revision ID: 3f9c2d7a5b18
+Revises: a697aab01023
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2d7a5b18'
+down_revision = 'a697aab01023'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have this table.
+    if not sa.inspect(op.get_bind()).has_table('keyword_event'):
+        op.create_table('keyword_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('keyword_id', sa.Integer(), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('priority', sa.String(length=50), nullable=False),
+        sa.Column('action', sa.String(length=10), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    with op.batch_alter_table('term', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('keywordHash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('keywordVersion', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('term', schema=None) as batch_op:
+        batch_op.drop_column('keywordVersion')
+        batch_op.drop_column('keywordHash')
+
+    op.drop_table('keyword_event')
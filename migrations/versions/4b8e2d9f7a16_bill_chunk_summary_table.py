@@ -0,0 +1,31 @@
+"""bill chunk summary table
+
+Revision ID: 4b8e2d9f7a16
+Revises: e7b3a9c41f62
+Create Date: 2026-10-18 16:21:07.514302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d9f7a16'
+down_revision = 'e7b3a9c41f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have this table.
+    if not sa.inspect(op.get_bind()).has_table('bill_chunk_summary'):
+        op.create_table('bill_chunk_summary',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+        )
+
+
+def downgrade():
+    op.drop_table('bill_chunk_summary')
@@ -0,0 +1,32 @@
+"""job owner and heartbeat
+
+Revision ID: 6e2a8c4f1d95
+Revises: d4c7e1a9b352
+Create Date: 2026-10-18 19:21:37.514208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2a8c4f1d95'
+down_revision = 'd4c7e1a9b352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have these columns.
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('job')}
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        if 'owner' not in columns:
+            batch_op.add_column(sa.Column('owner', sa.String(length=255), nullable=True))
+        if 'heartbeat_at' not in columns:
+            batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('owner')
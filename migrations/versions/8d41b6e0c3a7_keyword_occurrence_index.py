@@ -0,0 +1,47 @@
+"""keyword occurrence index
+
+Revision ID: 8d41b6e0c3a7
+Revises: 3f9c2d7a5b18
+Create Date: 2026-10-18 10:03:17.582144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e0c3a7'
+down_revision = '3f9c2d7a5b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have this table.
+    if not sa.inspect(op.get_bind()).has_table('keyword_occurrence'):
+        op.create_table('keyword_occurrence',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('keyword_id', sa.Integer(), nullable=False),
+        sa.Column('term_id', sa.Integer(), nullable=False),
+        sa.Column('field', sa.String(length=50), nullable=False),
+        sa.Column('start_offset', sa.Integer(), nullable=False),
+        sa.Column('end_offset', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.String(length=50), nullable=False),
+        sa.ForeignKeyConstraint(['keyword_id'], ['keyword.id'], ),
+        sa.ForeignKeyConstraint(['term_id'], ['term.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('keyword_occurrence', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_keyword_occurrence_keyword_id'), ['keyword_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_keyword_occurrence_term_id'), ['term_id'], unique=False)
+
+    # Force the next keyword sync to rescan every term so the index gets populated.
+    op.execute('UPDATE term SET "keywordHash" = NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('keyword_occurrence', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_keyword_occurrence_term_id'))
+        batch_op.drop_index(batch_op.f('ix_keyword_occurrence_keyword_id'))
+
+    op.drop_table('keyword_occurrence')
@@ -0,0 +1,49 @@
+"""legislative bill keys
+
+Revision ID: 9a1f5c3e8b27
+Revises: 4b8e2d9f7a16
+Create Date: 2026-10-18 17:04:52.381946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1f5c3e8b27'
+down_revision = '4b8e2d9f7a16'
+branch_labels = None
+depends_on = None
+
+# The original unique constraint on legislative_id was created without a name;
+# this convention lets batch mode find it when SQLite recreates the table.
+naming_convention = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def old_unique_name():
+    if op.get_bind().dialect.name == 'postgresql':
+        return 'legislative_bill_legislative_id_key'
+    return 'uq_legislative_bill_legislative_id'
+
+
+def upgrade():
+    with op.batch_alter_table('legislative_bill', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint(old_unique_name(), type_='unique')
+        batch_op.alter_column('legislative_id',
+               existing_type=sa.String(length=255),
+               type_=sa.Integer(),
+               existing_nullable=False,
+               postgresql_using='legislative_id::integer')
+        batch_op.create_unique_constraint('uq_legislative_bill_congress_id_legislative_id', ['congress_id', 'legislative_id'])
+        batch_op.create_index('ix_legislative_bill_legislative_id_congress_id', ['legislative_id', 'congress_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('legislative_bill', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_index('ix_legislative_bill_legislative_id_congress_id')
+        batch_op.drop_constraint('uq_legislative_bill_congress_id_legislative_id', type_='unique')
+        batch_op.alter_column('legislative_id',
+               existing_type=sa.Integer(),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+        batch_op.create_unique_constraint(old_unique_name(), ['legislative_id'])
@@ -0,0 +1,37 @@
+"""search index table
+
+Revision ID: b5d93f0e7c21
+Revises: 6e2a8c4f1d95
+Create Date: 2026-10-18 20:04:52.377120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d93f0e7c21'
+down_revision = '6e2a8c4f1d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite with FTS5 only; elsewhere search falls back to matching names. The app fills the
+    # new, empty index with a rebuild_search_index job when it next starts serving.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    if not bind.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+        return
+    # Replaces the table of the first search index revision, which kept its own copy of the text.
+    op.execute(sa.text('DROP TABLE IF EXISTS search_index'))
+    op.execute(sa.text(
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "title, body, extra, content = '', tokenize = 'porter unicode61')"
+    ))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(sa.text('DROP TABLE IF EXISTS search_index'))
@@ -0,0 +1,32 @@
+"""airtable record mapping
+
+Revision ID: c52e8f1a7d34
+Revises: 8d41b6e0c3a7
+Create Date: 2026-10-18 11:26:05.913377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e8f1a7d34'
+down_revision = '8d41b6e0c3a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have this table.
+    if not sa.inspect(op.get_bind()).has_table('airtable_record'):
+        op.create_table('airtable_record',
+        sa.Column('term_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('record_id', sa.String(length=32), nullable=False),
+        sa.Column('fields_hash', sa.String(length=64), nullable=True),
+        sa.PrimaryKeyConstraint('term_id'),
+        sa.UniqueConstraint('record_id')
+        )
+
+
+def downgrade():
+    op.drop_table('airtable_record')
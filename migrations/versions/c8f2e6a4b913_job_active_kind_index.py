@@ -0,0 +1,39 @@
+"""one active job per kind
+
+Revision ID: c8f2e6a4b913
+Revises: b5d93f0e7c21
+Create Date: 2026-10-18 22:41:09.618530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f2e6a4b913'
+down_revision = 'b5d93f0e7c21'
+branch_labels = None
+depends_on = None
+
+ACTIVE_JOB = "status IN ('queued', 'running')"
+
+
+def upgrade():
+    # Keep the newest active job of each kind; the index cannot be created over duplicates.
+    op.execute(sa.text(
+        "UPDATE job SET status = 'interrupted' "
+        f"WHERE {ACTIVE_JOB} AND EXISTS ("
+        "SELECT 1 FROM job AS newer WHERE newer.kind = job.kind "
+        "AND newer.status IN ('queued', 'running') AND newer.created_at > job.created_at)"
+    ))
+    # A database set up with create_all() before it was under Alembic may already have this index.
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('job')}
+    if 'uq_job_active_kind' not in indexes:
+        with op.batch_alter_table('job', schema=None) as batch_op:
+            batch_op.create_index('uq_job_active_kind', ['kind'], unique=True,
+                                  sqlite_where=sa.text(ACTIVE_JOB), postgresql_where=sa.text(ACTIVE_JOB))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('uq_job_active_kind')
@@ -0,0 +1,82 @@
+"""compressed text columns
+
+Revision ID: d4c7e1a9b352
+Revises: 9a1f5c3e8b27
+Create Date: 2026-10-18 17:48:13.092617
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.column_types import CompressedText
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c7e1a9b352'
+down_revision = '9a1f5c3e8b27'
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    'term': ['prompt', 'response'],
+    'legislative_bill': ['text'],
+}
+BATCH_SIZE = 500
+
+
+class _Utf8Bytes(sa.types.TypeDecorator):
+    impl = sa.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return value.encode('utf-8') if value is not None else None
+
+
+def rewrite(table_name, columns, read_type, write_type):
+    """Read every row's columns as read_type and write them back as write_type, in id batches."""
+    bind = op.get_bind()
+    source = sa.table(table_name, sa.column('id', sa.Integer), *[sa.column(name, read_type) for name in columns])
+    target = sa.table(table_name, sa.column('id', sa.Integer), *[sa.column(name, write_type) for name in columns])
+    last_id = None
+    while True:
+        query = sa.select(source).order_by(source.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(source.c.id > last_id)
+        rows = bind.execute(query).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(
+                target.update().where(target.c.id == row.id).values({name: getattr(row, name) for name in columns})
+            )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    for table_name, columns in COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for name in columns:
+                batch_op.alter_column(name,
+                       existing_type=sa.Text(),
+                       type_=sa.LargeBinary(),
+                       existing_nullable=True,
+                       postgresql_using=f"convert_to({name}, 'UTF8')")
+        rewrite(table_name, columns, CompressedText(), CompressedText())
+
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.get_context().autocommit_block():
+            op.execute('VACUUM')
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table_name, columns in COLUMNS.items():
+        # bytea only accepts bytes; SQLite must get str back so the values are TEXT again.
+        rewrite(table_name, columns, CompressedText(), _Utf8Bytes() if postgresql else sa.Text())
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for name in columns:
+                batch_op.alter_column(name,
+                       existing_type=sa.LargeBinary(),
+                       type_=sa.Text(),
+                       existing_nullable=True,
+                       postgresql_using=f"convert_from({name}, 'UTF8')")
@@ -0,0 +1,48 @@
+"""job table
+
+Revision ID: e7b3a9c41f62
+Revises: c52e8f1a7d34
+Create Date: 2026-10-18 13:02:41.228190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3a9c41f62'
+down_revision = 'c52e8f1a7d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database set up with create_all() before it was under Alembic may already have this table.
+    if not sa.inspect(op.get_bind()).has_table('job'):
+        op.create_table('job',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('params', sa.Text(), nullable=True),
+        sa.Column('checkpoint', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('done', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('job', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_job_kind'), ['kind'], unique=False)
+            batch_op.create_index(batch_op.f('ix_job_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_job_status'))
+        batch_op.drop_index(batch_op.f('ix_job_kind'))
+
+    op.drop_table('job')
@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import './AddLegislation.css';
 import { useNavigate } from 'react-router-dom';
+import { waitForJob } from '../jobs';
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -88,26 +89,43 @@ function AddLegislation({ isUpdate, existingData }) {
     const startId = parseInt(bulkLegislation.legislative_id_start, 10);
     const endId = parseInt(bulkLegislation.legislative_id_end, 10);
 
-    for (let id = startId; id <= endId; id++) {
-      const url = `${BACKEND_API_URL}/api/legislation/generate-and-save-legislation/${bulkLegislation.congress_id}/${id}`;
+    try {
+      const response = await fetch(`${BACKEND_API_URL}/api/legislation/generate-legislation-range`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          congress_id: bulkLegislation.congress_id,
+          legislative_id_start: startId,
+          legislative_id_end: endId,
+        }),
+      });
+      const result = await response.json();
+      if (!response.ok) {
+        throw new Error(result.error || result.message);
+      }
+      setLog(prevLog => [...prevLog, result.message]);
 
-      try {
-        const response = await fetch(url, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-        });
-        if (response.ok) {
-          setLog(prevLog => [...prevLog, `Successfully generated legislation ID: ${id}`]);
-        } else {
-          const errorData = await response.json();
-          setLog(prevLog => [...prevLog, `Failed to generate legislation ID: ${id} - ${errorData.error}`]);
+      let reported = 0;
+      const job = await waitForJob(result.job_id, (status) => {
+        if (status.done > reported) {
+          reported = status.done;
+          setLog(prevLog => [...prevLog, `Processed ${status.done} of ${status.total} legislation IDs`]);
         }
-      } catch (error) {
-        console.error('Error:', error);
-        setLog(prevLog => [...prevLog, `Error generating legislation ID: ${id}`]);
+      });
+      if (job.result) {
+        setLog(prevLog => [
+          ...prevLog,
+          `Generated ${job.result.created}, skipped ${job.result.skipped} existing`,
+          ...Object.entries(job.result.failed).map(([id, error]) => `Failed to generate legislation ID: ${id} - ${error}`),
+        ]);
+      } else {
+        setLog(prevLog => [...prevLog, `Legislation job ${job.status}: ${job.error || ''}`]);
       }
+    } catch (error) {
+      console.error('Error:', error);
+      setLog(prevLog => [...prevLog, `Error generating legislation: ${error.message}`]);
     }
 
     setLoading(false);
@@ -1,7 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import './AddTerm.css';
-import Papa from 'papaparse';
 import { Box, TextField, InputAdornment, Select, MenuItem } from '@mui/material';
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
@@ -28,7 +27,7 @@ function AddTerm() {
 
   const fetchKeywordOptions = async () => {
     try {
-      const response = await fetch(`${BACKEND_API_URL}/api/terms`);
+      const response = await fetch(`${BACKEND_API_URL}/api/terms?fields=name`);
       const data = await response.json();
       const terms = data.map(term => term.name);
       setKeywordOptions(terms);
@@ -68,68 +67,78 @@ function AddTerm() {
     setCsvFile(event.target.files[0]);
   };
 
+  const addLogEntry = (result) => {
+    if (result.status === 'created') {
+      setLog((prevLog) => [
+        ...prevLog,
+        <li
+          key={result.id}
+          className="success"
+          onClick={() => window.open(`/term/${result.id}`, '_blank')}
+        >
+          <span>Successfully added term: {result.name}</span>
+        </li>,
+      ]);
+    } else {
+      setLog((prevLog) => [
+        ...prevLog,
+        <li
+          key={`row-${result.row}`}
+          className="error"
+          onClick={() => alert(`Failed to add term: ${result.name}`)}
+        >
+          <span>Error adding term: {result.name} - {result.message}</span>
+        </li>,
+      ]);
+    }
+  };
+
   const handleBulkUpload = async () => {
     if (!csvFile) return;
   
     setLoading(true);
     setError(null);
     setLog([]);
-  
-    Papa.parse(csvFile, {
-      header: false,
-      skipEmptyLines: true,
-      complete: async (results) => {
-        const terms = results.data;
-        for (let i = 0; i < terms.length; i++) {
-          const [term, type, keywords, priority, customPrompt] = terms[i];
-          const termTypeValue = type || 'other';
-  
-          try {
-            const response = await fetch(`${BACKEND_API_URL}/api/terms/new`, {
-              method: 'POST',
-              headers: {
-                'Content-Type': 'application/json',
-              },
-              body: JSON.stringify({
-                name: term,
-                type: termTypeValue,
-                additional_keywords: keywords,
-                priority: priority,
-                custom_prompt: customPrompt || ''
-              }),
-            });
-  
-            if (!response.ok) {
-              throw new Error(`Failed to add term: ${term}`);
-            }
-  
-            const data = await response.json();
-            setLog((prevLog) => [
-              ...prevLog,
-              <li
-                key={data.id}
-                className="success"
-                onClick={() => window.open(`/term/${data.id}`, '_blank')}
-              >
-                <span>Successfully added term: {term}</span>
-              </li>,
-            ]);
-          } catch (error) {
-            setLog((prevLog) => [
-              ...prevLog,
-              <li
-                key={i}
-                className="error"
-                onClick={() => alert(`Failed to add term: ${term}`)}
-              >
-                <span>Error adding term: {term} - {error.message}</span>
-              </li>,
-            ]);
+
+    const formData = new FormData();
+    formData.append('file', csvFile);
+
+    try {
+      const response = await fetch(`${BACKEND_API_URL}/api/terms/bulk`, {
+        method: 'POST',
+        body: formData,
+      });
+      if (!response.ok) {
+        throw new Error('Network response was not ok');
+      }
+
+      // The server streams one server-sent event per CSV row, then a "done" event.
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const block of events) {
+          const eventLine = block.split('\n').find(line => line.startsWith('event: '));
+          const dataLine = block.split('\n').find(line => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+          const data = JSON.parse(dataLine.slice(6));
+          if (eventLine.slice(7) === 'row') {
+            addLogEntry(data);
+          } else if (eventLine.slice(7) === 'error') {
+            setError(data.message);
           }
         }
-        setLoading(false);
-      },
-    });
+      }
+    } catch (error) {
+      setError(error.message);
+    } finally {
+      setLoading(false);
+    }
   };
   const handleKeywordChange = (event) => {
     const inputValue = event.target.value;
@@ -2,6 +2,7 @@ import React from 'react';
 import Papa from 'papaparse';
 import { saveAs } from 'file-saver';
 import './CsvDownloadMenu.css';
+import { waitForJob } from '../jobs';
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -24,29 +25,6 @@ const CsvDownloadMenu = ({ termId, onClose }) => {
       });
   };
 
-  const fetchAllTermIds = async () => {
-    try {
-      const response = await fetch(`${BACKEND_API_URL}/api/terms?_=${new Date().getTime()}`, {
-        headers: {
-          'Cache-Control': 'no-cache'
-        }
-      });
-      console.log("Full response:", response);
-      const contentType = response.headers.get("content-type");
-      if (!contentType || !contentType.includes("application/json")) {
-        throw new Error("Received non-JSON response");
-      }
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      const data = await response.json();
-      return data.map(term => term.id);
-    } catch (error) {
-      console.error('Error fetching all term ids:', error);
-      return [];
-    }
-  };
-  
   const mergeTermAndAuditData = async (id) => {
     const termData = await fetchTermData(id);
     const auditData = await fetchAuditData(id);
@@ -60,40 +38,11 @@ const CsvDownloadMenu = ({ termId, onClose }) => {
   const downloadCsv = async (all = false, includeAudit = false) => {
     try {
       if (all) {
-        const termIds = await fetchAllTermIds();
-        console.log('Fetched term IDs:', termIds);
-        if (!termIds.length) {
-          throw new Error("No term IDs fetched");
+        const response = await fetch(`${BACKEND_API_URL}/api/terms/export.csv?audit=${includeAudit}`);
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const termPromises = termIds.map(id => includeAudit ? mergeTermAndAuditData(id) : fetchTermData(id));
-        const allTermsData = await Promise.all(termPromises);
-        console.log('Fetched all terms data:', allTermsData);
-        const csvData = allTermsData.filter(termData => termData !== null).map(termData => ({
-          id: termData.id,
-          name: termData.name,
-          prompt: termData.prompt,
-          response: termData.response,
-          faqQ1: termData.faqQ1,
-          faqA1: termData.faqA1,
-          faqQ2: termData.faqQ2,
-          faqA2: termData.faqA2,
-          faqQ3: termData.faqQ3,
-          faqA3: termData.faqA3,
-          faqQ4: termData.faqQ4,
-          faqA4: termData.faqA4,
-          faqQ5: termData.faqQ5,
-          faqA5: termData.faqA5,
-          highKeywords: termData.highKeywords,
-          mediumKeywords: termData.mediumKeywords,
-          lowKeywords: termData.lowKeywords,
-          faqHighKeywords: termData.faqHighKeywords,
-          faqMediumKeywords: termData.faqMediumKeywords,
-          faqLowKeywords: termData.faqLowKeywords,
-          auditData: includeAudit ? JSON.stringify(termData.auditData) : undefined,
-          auditNotes: includeAudit ? termData.auditNotes : undefined
-        }));
-        const csv = Papa.unparse(csvData);
-        const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
+        const blob = await response.blob();
         saveAs(blob, includeAudit ? 'all_terms_with_audit.csv' : 'all_terms.csv');
       } else {
         const termData = includeAudit ? await mergeTermAndAuditData(termId) : await fetchTermData(termId);
@@ -141,7 +90,12 @@ const CsvDownloadMenu = ({ termId, onClose }) => {
         method: 'POST'
       });
       const result = await response.json();
+      if (!response.ok) {
+        throw new Error(result.message);
+      }
       console.log(result.message);
+      const job = await waitForJob(result.job_id);
+      console.log(`Airtable push ${job.status}`, job.result || job.error);
     } catch (error) {
       console.error('Error sending all terms to Airtable:', error);
     }
@@ -154,6 +108,8 @@ const CsvDownloadMenu = ({ termId, onClose }) => {
       });
       const result = await response.json();
       console.log(result.message);
+      const job = await waitForJob(result.job_id);
+      console.log(`Airtable fetch ${job.status}`, job.result || job.error);
     } catch (error) {
       console.error('Error fetching data from Airtable and updating database:', error);
     }
@@ -166,8 +122,8 @@ const CsvDownloadMenu = ({ termId, onClose }) => {
       <button class="greyButton" onClick={() => downloadCsv(true)}>Download CSV for All Terms</button>
       <button class="greyButton" onClick={() => downloadCsv(false, true)}>Download CSV for Term with Audit Data</button>
       <button class="greyButton" onClick={() => downloadCsv(true, true)}>Download CSV for All Terms with Audit Data</button>
-      <button class="redButton" onClick={sendAllToAirtable}>Send All data to Airtable (3 mins)</button>
-      <button class="redButton" onClick={fetchFromAirtableAndUpdateDatabase}>Fetch data from Airtable (3 mins) </button>
+      <button class="redButton" onClick={sendAllToAirtable}>Send All data to Airtable</button>
+      <button class="redButton" onClick={fetchFromAirtableAndUpdateDatabase}>Fetch data from Airtable</button>
     </div>
   );
 };
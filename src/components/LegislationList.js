@@ -3,6 +3,7 @@ import { Link, useNavigate } from 'react-router-dom';
 import './LegislationList.css'; // Ensure the custom CSS is imported
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
+const BILL_PAGE_SIZE = 500;
 
 function LegislationList() {
   const [legislation, setLegislation] = useState([]);
@@ -17,21 +18,42 @@ function LegislationList() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetch(`${BACKEND_API_URL}/api/legislation/bills`)
-      .then(response => {
-        if (!response.ok) {
-          throw new Error('Network response was not ok');
-        }
-        return response.json();
-      })
-      .then(data => {
-        setLegislation(data);
-        setLoading(false);
-      })
-      .catch(error => {
+    // Load the list a page at a time so the first bills show up before a whole congress has arrived.
+    let cancelled = false;
+    const loadPage = (after) => {
+      const params = new URLSearchParams({ limit: BILL_PAGE_SIZE });
+      if (after) {
+        params.set('after', after);
+      }
+      return fetch(`${BACKEND_API_URL}/api/legislation/bills?${params}`)
+        .then(response => {
+          if (!response.ok) {
+            throw new Error('Network response was not ok');
+          }
+          const nextCursor = response.headers.get('X-Next-Cursor');
+          return response.json().then(data => ({ data, nextCursor }));
+        })
+        .then(({ data, nextCursor }) => {
+          if (cancelled) {
+            return;
+          }
+          setLegislation(previous => (after ? previous.concat(data) : data));
+          setLoading(false);
+          if (nextCursor && data.length === BILL_PAGE_SIZE) {
+            return loadPage(nextCursor);
+          }
+        });
+    };
+
+    loadPage(null).catch(error => {
+      if (!cancelled) {
         setError(error);
         setLoading(false);
-      });
+      }
+    });
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
   const filteredLegislation = legislation.filter(item => {
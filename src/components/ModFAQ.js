@@ -139,7 +139,7 @@ const ModFaq = ({ onClose, open, termId }) => {
         description: faqData.description,
       };
 
-      const response = await fetch(`${BACKEND_API_URL}/api/generate-new-faq`, {
+      const response = await fetch(`${BACKEND_API_URL}/api/generate-new-faq?cache=0`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -43,7 +43,7 @@ const ModSummary = ({ onClick, onClose, open, termId }) => {
   
     const fetchKeywordOptions = async () => {
       try {
-        const response = await fetch(`${BACKEND_API_URL}/api/terms`);
+        const response = await fetch(`${BACKEND_API_URL}/api/terms?fields=name`);
         const data = await response.json();
         const terms = data.map(term => term.name);
         setKeywordOptions(terms);
@@ -65,7 +65,7 @@ const ModSummary = ({ onClick, onClose, open, termId }) => {
       const data = await response.json();
       const prompt = data.prompt;
 
-      const regenerateResponse = await fetch(`${BACKEND_API_URL}/api/regenerate`, {
+      const regenerateResponse = await fetch(`${BACKEND_API_URL}/api/regenerate?cache=0`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
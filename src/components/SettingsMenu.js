@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import './SettingsMenu.css';
+import { waitForJob } from '../jobs';
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -55,6 +56,11 @@ const SettingsMenu = ({ termId }) => {
         throw new Error('Network response was not ok');
       }
 
+      const { job_id } = await response.json();
+      const job = await waitForJob(job_id);
+      if (job.status !== 'succeeded') {
+        throw new Error(`Keyword sync ${job.status}: ${job.error || ''}`);
+      }
       alert('Keywords synced successfully');
     } catch (error) {
       console.error('Error:', error);
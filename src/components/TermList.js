@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import './TermList.css'; // Ensure the custom CSS is imported
+import { waitForJob } from '../jobs';
 
 const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -18,7 +19,7 @@ function TermList() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetch(`${BACKEND_API_URL}/api/terms`)
+    fetch(`${BACKEND_API_URL}/api/terms?fields=name,audit`)
       .then(response => {
         if (!response.ok) {
           throw new Error('Network response was not ok');
@@ -78,6 +79,14 @@ function TermList() {
         }
         return response.json();
       })
+      .then(result => waitForJob(result.job_id))
+      .then(job => {
+        if (job.status !== 'succeeded') {
+          throw new Error(`Airtable fetch ${job.status}: ${job.error || ''}`);
+        }
+        return fetch(`${BACKEND_API_URL}/api/terms?fields=name,audit`);
+      })
+      .then(response => response.json())
       .then(data => {
         setTerms(data);
         setFetching(false);
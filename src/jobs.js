@@ -0,0 +1,24 @@
+const BACKEND_API_URL = process.env.REACT_APP_BACKEND_URL;
+
+const FINISHED_STATUSES = ['succeeded', 'failed', 'cancelled', 'interrupted'];
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Poll a background job started by a maintenance endpoint until it finishes.
+// onProgress is called with the job status after every poll.
+export async function waitForJob(jobId, onProgress, intervalMs = 1000) {
+  while (true) {
+    const response = await fetch(`${BACKEND_API_URL}/api/jobs/${jobId}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const job = await response.json();
+    if (onProgress) {
+      onProgress(job);
+    }
+    if (FINISHED_STATUSES.includes(job.status)) {
+      return job;
+    }
+    await sleep(intervalMs);
+  }
+}
@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+import pytest
+
+# The config reads these when app.config is first imported.
+_instance = tempfile.mkdtemp(prefix='terms-test-')
+os.environ['DEV_DATABASE_URL'] = f"sqlite:///{os.path.join(_instance, 'test.db')}"
+os.environ['BILL_CACHE_PATH'] = os.path.join(_instance, 'bill_cache')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app, start_services
+    app = create_app()
+    assert start_services(app)
+    return app
+
+
+@pytest.fixture
+def db(app):
+    from app.models import db
+    from app.search import search_index
+    with app.app_context():
+        yield db
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        # The deletes bypass the ORM hooks; with the tables empty a rebuild clears the index.
+        if search_index.enabled:
+            search_index.rebuild(db.session.connection())
+        db.session.commit()
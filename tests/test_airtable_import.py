@@ -0,0 +1,58 @@
+from app.airtable_import import import_airtable_records
+from app.models import Keyword, KeywordOccurrence, Term
+
+
+def record(term_id, name, **fields):
+    return {"id": f"rec{term_id}", "fields": {"id": term_id, "name": name, **fields}}
+
+
+def names(db):
+    return dict(db.session.query(Term.id, Term.name).order_by(Term.id))
+
+
+def test_import_inserts_updates_and_deletes(db):
+    import_airtable_records([record(1, 'Alpha'), record(2, 'Beta')])
+    counts = import_airtable_records([record(2, 'Beta', response='Changed'), record(3, 'Gamma')])
+    assert names(db) == {2: 'Beta', 3: 'Gamma'}
+    assert counts["terms_inserted"] == 1
+    assert counts["terms_updated"] == 1
+    assert counts["terms_deleted"] == 1
+
+
+def test_renumbered_term_replaces_stale_row(db):
+    import_airtable_records([record(1, 'Alpha'), record(2, 'Beta')])
+    counts = import_airtable_records([record(2, 'Beta'), record(3, 'Alpha')])
+    assert names(db) == {2: 'Beta', 3: 'Alpha'}
+    assert counts["terms_inserted"] == 1
+    assert counts["terms_deleted"] == 1
+
+
+def test_names_swapped_between_ids(db):
+    import_airtable_records([record(1, 'Alpha'), record(2, 'Beta')])
+    import_airtable_records([record(1, 'Beta'), record(2, 'Alpha')])
+    assert names(db) == {1: 'Beta', 2: 'Alpha'}
+
+
+def test_name_moves_to_id_on_later_page(db):
+    from app.airtable_import import import_airtable_pages
+    import_airtable_records([record(1, 'Alpha'), record(2, 'Beta')])
+    import_airtable_pages([[record(3, 'Alpha')], [record(1, 'Delta'), record(2, 'Beta')]])
+    assert names(db) == {1: 'Delta', 2: 'Beta', 3: 'Alpha'}
+
+
+def test_omitted_fields_match_null_columns(db):
+    db.session.add(Term(id=1, name='Alpha', keywordHash='abc'))
+    db.session.commit()
+    counts = import_airtable_records([record(1, 'Alpha')])
+    assert counts["terms_unchanged"] == 1
+    assert db.session.get(Term, 1).keywordHash == 'abc'
+
+
+def test_import_reindexes_keyword_occurrences(db):
+    import_airtable_records([record(9, 'Tariff')])
+    db.session.add(Keyword(keyword='tariff', priority='high', term_id=9))
+    db.session.commit()
+    import_airtable_records([record(1, 'Alpha', response='A tariff is a tax.'), record(9, 'Tariff')])
+    assert [(o.term_id, o.field, o.start_offset) for o in KeywordOccurrence.query] == [(1, 'response', 2)]
+    import_airtable_records([record(1, 'Alpha', response='No duties here.'), record(9, 'Tariff')])
+    assert KeywordOccurrence.query.count() == 0
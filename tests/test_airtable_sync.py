@@ -0,0 +1,28 @@
+import pytest
+
+from app.airtable_sync import delete_all_airtable_records
+from app.models import AirtableRecord
+
+
+class FailingClient:
+    """Lists 20 records and fails to delete the batch holding 'rec15'."""
+
+    def __init__(self):
+        self.records = [f'rec{n}' for n in range(20)]
+
+    def iter_records(self, **params):
+        return iter([{'id': record_id} for record_id in self.records])
+
+    def delete_records(self, record_ids):
+        if 'rec15' in record_ids:
+            raise RuntimeError('Airtable unavailable')
+        return list(record_ids)
+
+
+def test_failed_clear_keeps_mapping_of_records_left(db):
+    db.session.add_all([AirtableRecord(term_id=n, record_id=f'rec{n}') for n in range(20)])
+    db.session.commit()
+    with pytest.raises(RuntimeError):
+        delete_all_airtable_records(client=FailingClient(), concurrency=1)
+    db.session.rollback()
+    assert {mapping.record_id for mapping in AirtableRecord.query} == {f'rec{n}' for n in range(10, 20)}
@@ -0,0 +1,69 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.jobs import JobConflict, _utcnow, job_runner, job_type
+from app.models import Job
+
+release = threading.Event()
+
+
+@job_type('test_wait')
+def wait_job(ctx, **params):
+    release.wait(5)
+    return params
+
+
+@pytest.fixture
+def waiting(db):
+    release.clear()
+    yield
+    release.set()
+
+
+def test_submit_returns_active_job_with_same_params(db, waiting):
+    job, created = job_runner.submit('test_wait', start=1)
+    again, created_again = job_runner.submit('test_wait', start=1)
+    assert created and not created_again
+    assert again.id == job.id
+
+
+def test_submit_rejects_active_job_with_other_params(db, waiting):
+    job, _ = job_runner.submit('test_wait', start=1)
+    with pytest.raises(JobConflict) as error:
+        job_runner.submit('test_wait', start=2)
+    assert error.value.job.id == job.id
+
+
+def test_recover_leaves_live_jobs_alone(db):
+    now = _utcnow()
+    db.session.add_all([
+        Job(id='own', kind='a', status='running', owner=job_runner.owner, heartbeat_at=now - timedelta(hours=1)),
+        Job(id='remote', kind='b', status='running', owner='elsewhere:1', heartbeat_at=now),
+        Job(id='stale', kind='c', status='running', owner='elsewhere:2', heartbeat_at=now - timedelta(hours=1)),
+        Job(id='legacy', kind='d', status='queued'),
+    ])
+    db.session.commit()
+    job_runner.recover()
+    statuses = dict(db.session.query(Job.id, Job.status))
+    assert statuses == {'own': 'running', 'remote': 'running', 'stale': 'interrupted', 'legacy': 'interrupted'}
+
+
+def test_index_allows_one_active_job_per_kind(db):
+    db.session.add_all([Job(id='first', kind='a', status='running'), Job(id='done', kind='a', status='succeeded')])
+    db.session.commit()
+    db.session.add(Job(id='second', kind='a', status='queued'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_route_conflict_returns_existing_job(app, db):
+    db.session.add(Job(id='other', kind='pull_from_airtable', status='running', params='{"table": "x"}',
+                       owner=job_runner.owner, heartbeat_at=_utcnow()))
+    db.session.commit()
+    response = app.test_client().get('/api/terms/fetch_from_airtable')
+    assert response.status_code == 409
+    assert response.get_json()['job_id'] == 'other'
@@ -0,0 +1,15 @@
+from app.models import LegislativeBill
+from app.response_cache import response_cache
+
+
+def test_bill_cursor_only_when_another_page_exists(app, db):
+    response_cache.clear()
+    db.session.add_all([LegislativeBill(id=n, congress_id=118, legislative_id=n, bill_name=f'Bill {n}') for n in range(1, 5)])
+    db.session.commit()
+    client = app.test_client()
+    first = client.get('/api/legislation/bills?limit=2')
+    assert first.headers['X-Next-Cursor'] == '118:2'
+    last = client.get('/api/legislation/bills?limit=2&after=118:2')
+    assert [bill['legislative_id'] for bill in last.get_json()] == [3, 4]
+    assert 'X-Next-Cursor' not in last.headers
+    response_cache.clear()
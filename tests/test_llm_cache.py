@@ -0,0 +1,23 @@
+from app.llm_cache import LLMCache
+
+
+def test_size_is_summed_only_when_the_estimate_crosses_the_limit(tmp_path):
+    cache = LLMCache(str(tmp_path / 'llm.db'), max_bytes=1000)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for n in range(20):
+        cache.put(f'key{n}', 'model', 'x' * 100)
+    sums = [statement for statement in statements if 'SUM(size)' in statement]
+    assert 0 < len(sums) < 20
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get('key19') == 'x' * 100
+    assert cache.get('key0') is None
+
+
+def test_unusable_cache_falls_through(tmp_path):
+    cache = LLMCache(str(tmp_path / 'llm.db'))
+    cache.put('key', 'model', 'reply')
+    cache._conn.execute('DROP TABLE llm_response')
+    assert cache.get('key') is None
+    cache.put('key', 'model', 'reply')
+    assert cache.errors == 2
@@ -0,0 +1,33 @@
+import pytest
+
+from app.models import Term
+from app.response_cache import response_cache
+
+
+@pytest.fixture
+def terms(db):
+    response_cache.clear()
+    db.session.add_all([Term(id=n, name=f'Term {n}', response='x' * 100) for n in range(1, 6)])
+    db.session.commit()
+    yield
+    response_cache.clear()
+
+
+def test_streamed_miss_carries_etag(app, terms):
+    client = app.test_client()
+    first = client.get('/api/terms/')
+    assert first.status_code == 200
+    assert first.headers.get('ETag')
+    again = client.get('/api/terms/', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_large_stream_gets_etag_from_second_request(app, terms, monkeypatch):
+    monkeypatch.setattr(response_cache, 'buffer_bytes', 10)
+    client = app.test_client()
+    first = client.get('/api/terms/')
+    assert 'ETag' not in first.headers
+    body = first.get_json()
+    second = client.get('/api/terms/')
+    assert second.headers.get('ETag')
+    assert second.get_json() == body
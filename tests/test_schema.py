@@ -0,0 +1,51 @@
+import os
+
+import pytest
+from flask import Flask
+from flask_migrate import Migrate
+from sqlalchemy import inspect, text
+
+from app.models import db
+from app.schema import prepare_schema
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+
+@pytest.fixture
+def bare_app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'bare.db'}"
+    db.init_app(app)
+    migrate = Migrate(app, db, directory=MIGRATIONS)
+    with app.app_context():
+        yield app, migrate
+        db.engine.dispose()
+
+
+def test_empty_database_is_created_at_head(bare_app):
+    app, migrate = bare_app
+    assert prepare_schema(db, migrate)
+    tables = inspect(db.engine).get_table_names()
+    assert {'term', 'job', 'alembic_version'} <= set(tables)
+    assert 'owner' in {column['name'] for column in inspect(db.engine).get_columns('job')}
+
+
+def test_unversioned_database_is_left_for_stamp_and_upgrade(bare_app):
+    app, migrate = bare_app
+    with db.engine.begin() as connection:
+        connection.execute(text("CREATE TABLE term (id INTEGER PRIMARY KEY, name VARCHAR(255))"))
+    assert not prepare_schema(db, migrate)
+    assert inspect(db.engine).get_table_names() == ['term']
+
+
+def test_cli_commands_do_not_prepare_the_schema(app, monkeypatch):
+    from app import create_app
+    from app.jobs import job_runner
+    calls = []
+    monkeypatch.setattr('app.prepare_schema', lambda *args: calls.append(args))
+    # create_app() points the shared runner at the new app; keep the session app's.
+    monkeypatch.setattr(job_runner, 'app', app)
+    app = create_app()
+    result = app.test_cli_runner().invoke(args=['db', 'heads'])
+    assert result.exit_code == 0, result.output
+    assert calls == []
@@ -0,0 +1,15 @@
+from app.models import LegislativeBill
+from app.search import SNIPPET_WINDOW, search_index
+
+
+def test_snippet_of_long_bill_comes_from_around_the_match(db):
+    filler = 'appropriations for the fiscal year ' * 2000
+    db.session.add(LegislativeBill(id=1, congress_id=118, legislative_id=1, bill_name='Omnibus Act',
+                                   summary='Funding.', text=filler + 'and the zeppelins provision ' + filler))
+    db.session.commit()
+    assert search_index.enabled
+    total, results = search_index.search(db.session.connection(), 'zeppelin', 'bill')
+    assert total == 1
+    assert results[0]['title'] == 'Omnibus Act'
+    assert '<mark>zeppelins</mark>' in results[0]['snippet']
+    assert len(results[0]['snippet']) < SNIPPET_WINDOW
@@ -0,0 +1,32 @@
+from concurrent.futures import Future
+
+from app import term_generation
+from app.models import Keyword, Term
+from app.term_generation import bulk_generate_terms
+
+
+class FakeLLM:
+    def submit(self, prompt, **kwargs):
+        future = Future()
+        future.set_result(f"Answer to {prompt[:20]}")
+        return future
+
+
+def rows(*names):
+    return [(number, {"name": name, "type": '', "additional_keywords": '', "priority": 'high', "custom_prompt": ''})
+            for number, name in enumerate(names, 1)]
+
+
+def test_bulk_terms_take_ids_free_at_commit(db, monkeypatch):
+    monkeypatch.setattr(term_generation, 'get_llm_client', FakeLLM)
+    results = bulk_generate_terms(rows('Alpha', 'Beta', 'Gamma', 'Delta'), concurrency=1, batch_size=2)
+    first = next(results)
+    # A term created elsewhere while the run is going takes the next free id.
+    db.session.add(Term(id=first["id"] + 2, name='Elsewhere'))
+    db.session.commit()
+    created = [first] + list(results)
+    assert [entry["status"] for entry in created] == ['created'] * 4
+    ids = [entry["id"] for entry in created]
+    assert len(set(ids)) == 4 and first["id"] + 2 not in ids
+    assert db.session.query(Keyword).count() == 4
+    assert db.session.get(Term, first["id"] + 2).name == 'Elsewhere'
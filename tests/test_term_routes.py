@@ -0,0 +1,23 @@
+import pytest
+
+from app.models import Term
+from app.response_cache import response_cache
+
+
+@pytest.fixture
+def terms(db):
+    response_cache.clear()
+    db.session.add_all([Term(id=n, name=f'Term {n}') for n in range(1, 6)])
+    db.session.commit()
+    yield
+    response_cache.clear()
+
+
+def test_cursor_only_when_another_page_exists(app, terms):
+    client = app.test_client()
+    first = client.get('/api/terms/?limit=3')
+    assert [term['id'] for term in first.get_json()] == [1, 2, 3]
+    assert first.headers['X-Next-Cursor'] == '3'
+    last = client.get('/api/terms/?limit=2&after=3')
+    assert [term['id'] for term in last.get_json()] == [4, 5]
+    assert 'X-Next-Cursor' not in last.headers